@@ -1,12 +1,12 @@
 #Django imports
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-
-from rest_framework.authentication import TokenAuthentication
 from rest_framework import viewsets, permissions
 
+# Project imports
+from loan_manager.response_cache import cache_response
+
 # Account app imports
 from account.api import serializers
+from account.authentication import CachedTokenAuthentication
 from account.models import Account
 
 
@@ -14,14 +14,14 @@ class AccountViewSet(viewsets.ModelViewSet):
     """API endpoint that allows accounts to be viewed or edited."""
     queryset = Account.objects.all().order_by('-date_joined')
     serializer_class = serializers.AccountSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated,
                           permissions.IsAdminUser]
 
-    @method_decorator(cache_page(60 * 15, key_prefix='account_list'))
+    @cache_response('account_list', namespace='accounts')
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-    @method_decorator(cache_page(60 * 15, key_prefix='account_detail'))
+    @cache_response('account_detail', namespace='accounts')
     def get(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
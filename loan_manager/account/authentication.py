@@ -0,0 +1,155 @@
+# Libs imports
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+
+# Django imports
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class LocalLRUCache:
+    """Small thread safe in-process cache with a maximum size and a TTL."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Account fields cached with a token. Requests get a new account built from
+# them, and its other fields are loaded from the database on first access.
+CACHED_USER_FIELDS = ['id', 'is_active', 'is_admin', 'is_staff', 'is_superuser']
+
+local_tokens = LocalLRUCache(settings.TOKEN_LOCAL_CACHE_SIZE,
+                             settings.TOKEN_LOCAL_CACHE_TIMEOUT)
+
+
+def token_cache_key(key):
+    # The token itself is a credential, so only its digest is stored
+    return 'auth_token_user:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def invalidate_token(key):
+    """Drop a cached token now and again after the commit.
+
+    The second pass removes entries cached from the old rows by concurrent
+    requests before the change was committed. Only the LRU of the current
+    process is cleared: the other processes keep using their copy for up to
+    ``TOKEN_LOCAL_CACHE_TIMEOUT`` seconds.
+    """
+    cache_key = token_cache_key(key)
+
+    def invalidate():
+        local_tokens.delete(cache_key)
+        cache.delete(cache_key)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching the account flags of the token.
+
+    Tokens are looked up in a per-process LRU, then in the default cache and
+    only then in the database. Only the ``CACHED_USER_FIELDS`` of the account
+    are cached, never its password hash, and every request gets its own
+    account and token built from them. Entries are dropped when the token is
+    created or deleted and when its account is saved, and expire after a
+    short TTL.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        fields = local_tokens.get(cache_key)
+        if fields is None:
+            fields = cache.get(cache_key)
+            if fields is None:
+                _, token = super().authenticate_credentials(key)
+                fields = {field: getattr(token.user, field) for field in CACHED_USER_FIELDS}
+                cache.set(cache_key, fields, settings.TOKEN_CACHE_TIMEOUT)
+            local_tokens.set(cache_key, fields)
+
+        user = self.build_user(fields)
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        token = Token.from_db(DEFAULT_DB_ALIAS, ['key', 'user_id'], [key, user.pk])
+        token.user = user
+        return (user, token)
+
+    def build_user(self, fields):
+        # from_db takes the values in the order of the model fields
+        model = get_user_model()
+        names = [field.attname for field in model._meta.concrete_fields
+                 if field.attname in fields]
+        return model.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """Set the user of WebSocket connections from their token.
+
+    Browsers can't send headers with a WebSocket handshake, so the token is
+    read from the ``token`` query parameter and then from the Authorization
+    header. Connections without a valid token get the anonymous user.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await self.get_user(self.get_key(scope)))
+        return await super().__call__(scope, receive, send)
+
+    def get_key(self, scope):
+        query = parse_qs(scope.get('query_string', b'').decode('latin1'))
+        if query.get('token'):
+            return query['token'][0]
+        header = dict(scope.get('headers', [])).get(b'authorization', b'').split()
+        if len(header) == 2 and header[0].lower() == b'token':
+            return header[1].decode('latin1')
+        return None
+
+    @database_sync_to_async
+    def get_user(self, key):
+        if not key:
+            return AnonymousUser()
+        try:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+        except AuthenticationFailed:
+            return AnonymousUser()
+        return user
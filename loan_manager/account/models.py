@@ -2,10 +2,16 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+# Project imports
+from loan_manager.response_cache import bump_data_version
+
+# Account app imports
+from account.authentication import invalidate_token
+
 
 class AccountManager(BaseUserManager):
     def create_user(self, email, username, password=None):
@@ -72,3 +78,23 @@ class Account(AbstractBaseUser):
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance=None, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def account_tokens_changed(sender, instance=None, created=False, **kwargs):
+    # Cached tokens hold a copy of the account, e.g. of is_active
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidate_token(key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def account_changed(sender, instance=None, **kwargs):
+    bump_data_version('accounts', instance.pk)
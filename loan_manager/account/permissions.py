@@ -0,0 +1,9 @@
+# Django imports
+from rest_framework.permissions import BasePermission
+
+
+class IsAdmin(BasePermission):
+    """Allows access only to the accounts flagged as ``is_admin``."""
+
+    def has_permission(self, request, view):
+        return bool(request.user and getattr(request.user, 'is_admin', False))
@@ -1,8 +1,11 @@
 # Rest Framework imports
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
 # Account app imports
+from account.authentication import (CachedTokenAuthentication, local_tokens,
+                                    token_cache_key)
 from account.models import Account
 
 
@@ -29,6 +32,45 @@ class TestAccount(APITestCase):
                                                 'password': 'password123'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_token_authentication_cache(self):
+        token = Token.objects.get(user=self.admin_account)
+        self.client.logout()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get('/account/accounts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(local_tokens.get(token_cache_key(token.key)),
+                         {'id': self.admin_account.pk,
+                          'is_active': True,
+                          'is_admin': True,
+                          'is_staff': True,
+                          'is_superuser': True})
+
+        self.admin_account.is_active = False
+        self.admin_account.save()
+        self.assertIsNone(local_tokens.get(token_cache_key(token.key)))
+        response = self.client.get('/account/accounts/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_authentication_cache_deleted_token(self):
+        token = Token.objects.get(user=self.admin_account)
+        self.client.logout()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.client.get('/account/accounts/')
+        token.delete()
+        response = self.client.get('/account/accounts/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_authentication_builds_user_per_request(self):
+        token = Token.objects.get(user=self.account)
+        authentication = CachedTokenAuthentication()
+        first_user, first_token = authentication.authenticate_credentials(token.key)
+        second_user, _ = authentication.authenticate_credentials(token.key)
+        self.assertIsNot(first_user, second_user)
+        self.assertEqual(first_token.user, self.account)
+        self.assertNotIn('password', first_user.__dict__)
+        # The fields not cached are loaded on first access
+        self.assertEqual(first_user.email, 'jon@mail.com')
+
     # Tests for GET requests
     def test_accounts_list(self):
         response = self.client.get('/account/accounts/')
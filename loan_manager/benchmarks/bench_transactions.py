@@ -0,0 +1,92 @@
+# Libs imports
+import io
+from decimal import Decimal
+
+# Django imports
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+# Transactions app imports
+from transactions.api.parsers import ORJSONParser
+from transactions.api.renderers import ORJSONRenderer
+from transactions.api.serializers import (LoanReadSerializer, LoanSerializer,
+                                          PaymentReadSerializer, PaymentSerializer)
+from transactions.models import Loan, Payment
+
+# Rows serialized by the list serializer benchmarks, repeating the portfolio
+ROWS = 10000
+
+
+def bench_loan_serializer_many(benchmark, loans):
+    request = APIRequestFactory().get('/loans/')
+    benchmark(lambda: LoanSerializer(loans,
+                                     context={'request': request},
+                                     many=True).data)
+
+
+def bench_loan_serializer_10k_rows(benchmark, loans):
+    loans = (loans * (ROWS // len(loans) + 1))[:ROWS]
+    request = APIRequestFactory().get('/loans/')
+    benchmark(lambda: LoanSerializer(loans,
+                                     context={'request': request},
+                                     many=True).data)
+
+
+def bench_loan_read_serializer_10k_rows(benchmark, loans):
+    rows = list(LoanReadSerializer.values(Loan.objects.all()))
+    rows = (rows * (ROWS // len(rows) + 1))[:ROWS]
+    benchmark(lambda: LoanReadSerializer(rows).data)
+
+
+def bench_payment_serializer_10k_rows(benchmark, db):
+    payments = list(Payment.objects.all()[:ROWS])
+    payments = (payments * (ROWS // len(payments) + 1))[:ROWS]
+    request = APIRequestFactory().get('/payments/')
+    benchmark(lambda: PaymentSerializer(payments,
+                                        context={'request': request},
+                                        many=True).data)
+
+
+def bench_payment_read_serializer_10k_rows(benchmark, db):
+    rows = list(PaymentReadSerializer.values(Payment.objects.all()[:ROWS]))
+    rows = (rows * (ROWS // len(rows) + 1))[:ROWS]
+    benchmark(lambda: PaymentReadSerializer(rows).data)
+
+
+def loan_rows_data():
+    rows = list(LoanReadSerializer.values(Loan.objects.all()))
+    return LoanReadSerializer((rows * (ROWS // len(rows) + 1))[:ROWS]).data
+
+
+def bench_json_renderer_10k_loans(benchmark, loans):
+    data = loan_rows_data()
+    benchmark(lambda: JSONRenderer().render(data))
+
+
+def bench_orjson_renderer_10k_loans(benchmark, loans):
+    data = loan_rows_data()
+    benchmark(lambda: ORJSONRenderer().render(data))
+
+
+def bench_json_parser_10k_loans(benchmark, loans):
+    content = JSONRenderer().render(loan_rows_data())
+    benchmark(lambda: JSONParser().parse(io.BytesIO(content)))
+
+
+def bench_orjson_parser_10k_loans(benchmark, loans):
+    content = JSONRenderer().render(loan_rows_data())
+    benchmark(lambda: ORJSONParser().parse(io.BytesIO(content)))
+
+
+def bench_loan_get_interest_value(benchmark, loans):
+    benchmark(lambda: [loan.get_interest_value for loan in loans])
+
+
+def bench_payment_serializer_validate(benchmark, loans):
+    payment = Payment.objects.select_related('loan').first()
+    request = APIRequestFactory().post('/payments/')
+    request.user = payment.loan.user_account
+    serializer = PaymentSerializer(context={'request': request})
+    data = {'loan': payment.loan, 'date': payment.date, 'value': Decimal('0.01')}
+    benchmark(serializer.validate, data)
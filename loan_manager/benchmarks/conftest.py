@@ -0,0 +1,21 @@
+# Libs imports
+import pytest
+
+# Benchmarks imports
+from benchmarks.data import generate
+
+# Loans of the portfolio used by the microbenchmarks
+PORTFOLIO_SIZE = 1000
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        generate(PORTFOLIO_SIZE, accounts=1)
+
+
+@pytest.fixture
+def loans(db):
+    from transactions.models import Loan
+
+    return list(Loan.objects.all())
@@ -0,0 +1,98 @@
+"""Generate a benchmark portfolio of loans and payments with bulk_create.
+
+Usage, from the loan_manager folder:
+
+    ./manage.py shell -c "from benchmarks.data import generate; generate(100000)"
+
+or ``python -m benchmarks.data --loans 100000``.
+"""
+# Libs imports
+import argparse
+import datetime
+import random
+from decimal import Decimal
+
+# Django imports
+from django.db import transaction
+
+BENCH_EMAIL = 'bench@loan-manager.test'
+BENCH_PASSWORD = 'bench-password'
+BANKS = ['BRB', 'Itaú', 'Bradesco', 'Caixa', 'Santander', 'Nubank']
+
+
+def get_accounts(count):
+    from account.models import Account
+
+    accounts = []
+    for index in range(count):
+        email = BENCH_EMAIL if index == 0 else f'bench_{index}@loan-manager.test'
+        account = Account.objects.filter(email=email).first()
+        if account is None:
+            account = Account.objects.create_user(email=email,
+                                                  username=email.split('@')[0],
+                                                  password=BENCH_PASSWORD)
+        accounts.append(account)
+    return accounts
+
+
+def generate(loans, payments_per_loan=3, accounts=10, batch_size=10000, seed=0):
+    """Insert ``loans`` loans spread over ``accounts`` accounts.
+
+    Every loan receives ``payments_per_loan`` payments that never exceed its
+    full debt, and the stored balances are filled in as Loan.save would.
+    The first account logs in with BENCH_EMAIL and BENCH_PASSWORD.
+    """
+    from transactions.models import Loan, Payment
+
+    rng = random.Random(seed)
+    owners = get_accounts(accounts)
+    today = datetime.date.today()
+    for start in range(0, loans, batch_size):
+        batch = []
+        for _ in range(min(batch_size, loans - start)):
+            loan = Loan(
+                user_account=rng.choice(owners),
+                nominal_value=Decimal(rng.randint(100000, 10000000)).scaleb(-2),
+                interest_rate=Decimal(rng.randint(50, 300)).scaleb(-2),
+                request_date=today,
+                end_date=today + datetime.timedelta(days=rng.randint(30, 3650)),
+                bank=rng.choice(BANKS),
+                client=f'Client {rng.randint(1, loans)}',
+                interest_type=rng.choice(Loan.InterestType.values)
+            )
+            loan.compute_balances()
+            batch.append(loan)
+
+        with transaction.atomic():
+            Loan.objects.bulk_create(batch)
+            payments = []
+            for loan in batch:
+                value = (loan.full_debt / (payments_per_loan + 1)).quantize(Decimal('0.01'))
+                for _ in range(payments_per_loan):
+                    payments.append(Payment(loan=loan,
+                                            date=today,
+                                            value=value))
+                loan.total_paid = value * payments_per_loan
+                loan.compute_balances()
+            Payment.objects.bulk_create(payments, batch_size=batch_size)
+            Loan.objects.bulk_update(batch,
+                                     ['total_paid', 'outstanding_balance'],
+                                     batch_size=batch_size)
+
+
+if __name__ == '__main__':
+    import os
+
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'loan_manager.settings')
+    django.setup()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loans', type=int, default=1000)
+    parser.add_argument('--payments-per-loan', type=int, default=3)
+    parser.add_argument('--accounts', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.loans, args.payments_per_loan, args.accounts, args.batch_size, args.seed)
@@ -0,0 +1,67 @@
+"""Load scenario for the transactions API.
+
+Generate data with benchmarks/data.py, start the server and run, from the
+loan_manager folder:
+
+    locust -f benchmarks/locustfile.py --host http://localhost:3000 \
+        --headless -u 100 -r 10 -t 2m
+
+Aggregated statistics are written to benchmarks/results/locust-<time>.json.
+"""
+# Libs imports
+import datetime
+import json
+import os
+import random
+
+from locust import HttpUser, between, events, task
+
+# Benchmarks imports
+from benchmarks.data import BENCH_EMAIL, BENCH_PASSWORD
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class TransactionsUser(HttpUser):
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        response = self.client.post('/login/', {'username': BENCH_EMAIL,
+                                                'password': BENCH_PASSWORD})
+        self.client.headers['Authorization'] = f'Token {response.json()["token"]}'
+        response = self.client.get('/loans/', params={'page_size': 100},
+                                   name='/loans/')
+        self.loan_ids = [loan['id'] for loan in response.json()['results']]
+
+    @task(5)
+    def loans_list(self):
+        self.client.get('/loans/', name='/loans/')
+
+    @task(3)
+    def payments_list(self):
+        self.client.get('/payments/', name='/payments/')
+
+    @task(1)
+    def payment_post(self):
+        self.client.post('/payments/',
+                         {'loan': random.choice(self.loan_ids),
+                          'date': datetime.date.today().isoformat(),
+                          'value': '0.01'},
+                         name='POST /payments/')
+
+
+@events.quitting.add_listener
+def save_results(environment, **kwargs):
+    results = {}
+    for (method, name), entry in environment.stats.entries.items():
+        results[f'{method} {name}'] = {
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'rps': entry.total_rps,
+            'p50_ms': entry.get_response_time_percentile(0.5),
+            'p95_ms': entry.get_response_time_percentile(0.95),
+            'p99_ms': entry.get_response_time_percentile(0.99),
+        }
+    started = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    with open(os.path.join(RESULTS_DIR, f'locust-{started}.json'), 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
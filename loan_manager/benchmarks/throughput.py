@@ -0,0 +1,119 @@
+"""Compare the read throughput of servers under many concurrent connections.
+
+Generate data with benchmarks/data.py and start the same code behind the
+WSGI and the ASGI server, from the loan_manager folder:
+
+    gunicorn loan_manager.wsgi:application -c gunicorn.conf.py \
+        -k gthread --threads 4 --bind 0.0.0.0:8000
+    gunicorn loan_manager.asgi:application -c gunicorn.conf.py --bind 0.0.0.0:8001
+
+Then run:
+
+    python -m benchmarks.throughput --target wsgi=http://0.0.0.0:8000 \
+        --target asgi=http://0.0.0.0:8001 --concurrency 200 --duration 30
+
+Every connection requests the loans_list, loan_detail, payments_per_loan and
+payments_list endpoints in turn. The results are printed and written to
+benchmarks/results/throughput-<time>.json.
+"""
+# Libs imports
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import time
+
+import httpx
+
+# Benchmarks imports
+from benchmarks.data import BENCH_EMAIL, BENCH_PASSWORD
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+async def get_paths(client):
+    response = await client.post('/login/', data={'username': BENCH_EMAIL,
+                                                  'password': BENCH_PASSWORD})
+    response.raise_for_status()
+    client.headers['Authorization'] = f'Token {response.json()["token"]}'
+
+    response = await client.get('/loans/', params={'page_size': 100})
+    if not response.json()['results']:
+        raise SystemExit('The benchmark account has no loans, run benchmarks/data.py first.')
+    paths = []
+    for loan in response.json()['results']:
+        paths += ['/loans/',
+                  f'/loans/{loan["id"]}/',
+                  f'/loans/{loan["id"]}/payments/',
+                  '/payments/']
+    return paths
+
+
+async def connection(client, paths, offset, deadline, latencies, errors):
+    index = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(paths[index % len(paths)])
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+        index += 1
+
+
+async def measure(url, concurrency, duration):
+    limits = httpx.Limits(max_connections=concurrency,
+                          max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        paths = await get_paths(client)
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            connection(client, paths, offset, deadline, latencies, errors)
+            for offset in range(concurrency)
+        ])
+
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', action='append', required=True,
+                        help='name=url of a server, may be repeated')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=30)
+    options = parser.parse_args()
+
+    results = {}
+    for target in options.target:
+        name, url = target.split('=', 1)
+        results[name] = asyncio.run(measure(url, options.concurrency, options.duration))
+        print(f'{name}: {results[name]["rps"]} req/s, p50 {results[name]["p50_ms"]} ms, '
+              f'p99 {results[name]["p99_ms"]} ms, {results[name]["errors"]} errors')
+
+    started = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    with open(os.path.join(RESULTS_DIR, f'throughput-{started}.json'), 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Gunicorn settings. The default worker serves loan_manager.asgi with
+# uvicorn; pass -k gthread to serve loan_manager.wsgi instead.
+# Libs imports
+import multiprocessing
+
+# Gunicorn reads every module level name as a setting, config included
+from decouple import config as env
+
+# Every worker has its own connection pool of DB_POOL_MAX_SIZE connections
+# (derived from ASYNC_VIEW_THREADS in settings.py; without the pool, one
+# connection per thread), and all of them have to fit in the connections
+# Postgres accepts from the workers: its max_connections, less the reserved
+# ones and those of other clients.
+async_view_threads = env('ASYNC_VIEW_THREADS', default=20, cast=int)
+db_pool_max_size = (env('DB_POOL_MAX_SIZE', default=async_view_threads + 1, cast=int)
+                    or async_view_threads + 1)
+db_max_connections = env('DB_MAX_CONNECTIONS', default=90, cast=int)
+
+bind = env('BIND', default='0.0.0.0:3000')
+# As many workers as the CPUs keep busy, within the connections budget
+workers = env('WEB_CONCURRENCY',
+              default=max(min(multiprocessing.cpu_count() * 2 + 1,
+                              db_max_connections // db_pool_max_size), 1),
+              cast=int)
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Recycle the workers now and then, so a leak can't grow forever
+max_requests = env('MAX_REQUESTS', default=10000, cast=int)
+max_requests_jitter = max_requests // 10
+
+timeout = env('WORKER_TIMEOUT', default=60, cast=int)
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+
+
+def on_starting(server):
+    # Checked against the final number of workers, which -w can override
+    connections = server.cfg.workers * db_pool_max_size
+    if connections > db_max_connections:
+        raise RuntimeError(
+            f'{server.cfg.workers} workers x DB_POOL_MAX_SIZE ({db_pool_max_size}) = '
+            f'{connections} connections exceed DB_MAX_CONNECTIONS ({db_max_connections}). '
+            f'Lower WEB_CONCURRENCY or ASYNC_VIEW_THREADS, or raise max_connections '
+            f'on the Postgres server and DB_MAX_CONNECTIONS.'
+        )
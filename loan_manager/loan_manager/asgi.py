@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from channels.routing import ProtocolTypeRouter, URLRouter
+
+from loan_manager.handlers import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'loan_manager.settings')
 
-application = get_asgi_application()
+# Set up Django before importing the consumers and their models
+django_application = get_asgi_application()
+
+from account.authentication import TokenAuthMiddleware  # noqa: E402
+from transactions.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_application,
+    'websocket': TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
@@ -0,0 +1,53 @@
+# Libs imports
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+# Django imports
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+# Project imports
+from loan_manager.perf import instrument_queries
+
+# Threads running the views served by async_view under ASGI. Each thread
+# keeps its own database connection, so this also caps the connections of
+# a worker process.
+executor = ThreadPoolExecutor(max_workers=settings.ASYNC_VIEW_THREADS,
+                              thread_name_prefix='async-view')
+
+
+def async_view(view):
+    """Serve a sync view from a coroutine.
+
+    Under ASGI, Django runs every sync view of a process on one shared
+    thread. The wrapped view runs instead on the ``executor`` pool, so
+    concurrent requests wait on the database in parallel while the event
+    loop keeps accepting connections. Under WSGI (and the test client) the
+    view still runs on the request thread.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if isinstance(request, ASGIRequest):
+            return await sync_to_async(_run_view,
+                                       thread_sensitive=False,
+                                       executor=executor)(view, request, *args, **kwargs)
+        return await sync_to_async(view)(request, *args, **kwargs)
+    return wrapper
+
+
+def _run_view(view, request, *args, **kwargs):
+    # The request_started/finished signals only close the connections of
+    # Django's own sync thread, so the pool threads close theirs here
+    close_old_connections()
+    try:
+        with instrument_queries():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                # Render the body here rather than on Django's sync thread
+                response.render()
+        return response
+    finally:
+        close_old_connections()
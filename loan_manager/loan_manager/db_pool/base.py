@@ -0,0 +1,36 @@
+# Django imports
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+# Project imports
+from loan_manager.db_pool.creation import DatabaseCreation
+from loan_manager.db_pool.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend taking its connections from a process-wide pool.
+
+    Closing a connection returns it to the pool, so with ``CONN_MAX_AGE = 0``
+    each request or view thread holds a connection only while it runs. The
+    pool is configured by the ``POOL`` entry of the database settings.
+    """
+    creation_class = DatabaseCreation
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        options = {name.lower(): value
+                   for name, value in self.settings_dict.get('POOL', {}).items()}
+        self.pool = get_pool(conn_params, options)
+        connection = self.pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # Set by the parent on new connections only
+        self.isolation_level = self.settings_dict['OPTIONS'].get('isolation_level',
+                                                                 connection.isolation_level)
+        return connection
+
+    @async_unsafe
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
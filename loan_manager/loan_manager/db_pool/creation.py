@@ -0,0 +1,13 @@
+# Django imports
+from django.db.backends.postgresql import creation
+
+# Project imports
+from loan_manager.db_pool.pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the database from being dropped
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
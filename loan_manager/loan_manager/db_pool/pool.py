@@ -0,0 +1,190 @@
+# Libs imports
+import collections
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import (TRANSACTION_STATUS_IDLE,
+                                 TRANSACTION_STATUS_UNKNOWN)
+
+# Project imports
+from loan_manager.perf import percentile
+
+# Pools of the process, one per set of connection parameters
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Thread safe pool of psycopg2 connections shared by a process.
+
+    At most ``max_size`` connections are open. A checkout waits up to
+    ``timeout`` seconds for a connection to be returned when all are in use.
+    Idle connections are checked with ``SELECT 1`` when unused for
+    ``check_after`` seconds and closed after ``max_lifetime`` seconds, and
+    broken ones are replaced by new connections.
+    """
+
+    def __init__(self, name, max_size=20, timeout=10, check_after=30, max_lifetime=3600):
+        self.name = name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+
+        self.condition = threading.Condition()
+        # Open connections and connections being opened
+        self.size = 0
+        # (connection, returned at) pairs, the most recently used last
+        self.idle = []
+        self.created_at = {}
+        self.counters = collections.Counter()
+        self.checkout_ms = collections.deque(maxlen=1000)
+
+    def getconn(self, connect):
+        """Check out a connection, opened with ``connect()`` if needed."""
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self.condition:
+                if not self.idle and self.size >= self.max_size:
+                    waited = True
+                    remaining = start + self.timeout - time.monotonic()
+                    if remaining <= 0 or not self.condition.wait(remaining):
+                        self.counters['timeouts'] += 1
+                        raise psycopg2.OperationalError(
+                            f'No connection of the {self.name} pool was free '
+                            f'after {self.timeout} seconds.'
+                        )
+                    continue
+                if self.idle:
+                    connection, returned_at = self.idle.pop()
+                else:
+                    connection = None
+                    self.size += 1
+
+            if connection is None:
+                connection = self.open(connect)
+            elif not self.usable(connection, returned_at):
+                continue
+
+            checkout_ms = (time.monotonic() - start) * 1000
+            with self.condition:
+                self.counters['checkouts'] += 1
+                self.counters['waits'] += int(waited)
+                self.checkout_ms.append(checkout_ms)
+            return connection
+
+    def putconn(self, connection):
+        """Return a connection, closing it when it is broken or too old."""
+        if not connection.closed:
+            status = connection.info.transaction_status
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                self.discard(connection, 'broken')
+                return
+            if status != TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    self.discard(connection, 'broken')
+                    return
+        if connection.closed:
+            self.discard(connection, 'broken')
+        elif time.monotonic() - self.created_at[connection] > self.max_lifetime:
+            self.discard(connection, 'recycled')
+        else:
+            with self.condition:
+                self.idle.append((connection, time.monotonic()))
+                self.condition.notify()
+
+    def open(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.created_at[connection] = time.monotonic()
+            self.counters['created'] += 1
+        return connection
+
+    def usable(self, connection, returned_at):
+        now = time.monotonic()
+        if connection.closed:
+            self.discard(connection, 'broken')
+            return False
+        if now - self.created_at[connection] > self.max_lifetime:
+            self.discard(connection, 'recycled')
+            return False
+        if now - returned_at > self.check_after:
+            with self.condition:
+                self.counters['health_checks'] += 1
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except psycopg2.Error:
+                self.discard(connection, 'broken')
+                return False
+        return True
+
+    def discard(self, connection, reason):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self.condition:
+            if self.created_at.pop(connection, None) is not None:
+                self.size -= 1
+            self.counters[reason] += 1
+            self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection, 'closed')
+
+    def stats(self):
+        with self.condition:
+            checkout_ms = list(self.checkout_ms)
+            stats = {
+                'max_size': self.max_size,
+                'size': len(self.created_at),
+                'in_use': len(self.created_at) - len(self.idle),
+                'idle': len(self.idle),
+                **{name: self.counters[name] for name in ['checkouts', 'waits', 'timeouts',
+                                                          'created', 'health_checks',
+                                                          'broken', 'recycled']},
+            }
+        stats['checkout_ms'] = {
+            'p50': round(percentile(checkout_ms, 50), 3) if checkout_ms else None,
+            'p95': round(percentile(checkout_ms, 95), 3) if checkout_ms else None,
+            'max': round(max(checkout_ms), 3) if checkout_ms else None,
+        }
+        return stats
+
+
+def get_pool(conn_params, options):
+    """Pool of the connections opened with ``conn_params``."""
+    key = tuple(sorted(conn_params.items()))
+    pool = pools.get(key)
+    if pool is None:
+        with pools_lock:
+            pool = pools.get(key)
+            if pool is None:
+                name = f'{conn_params.get("database")}@{conn_params.get("host", "localhost")}'
+                pool = pools[key] = ConnectionPool(name, **options)
+    return pool
+
+
+def close_pools(database=None):
+    """Close the idle connections of every pool, or of one database."""
+    for key, pool in list(pools.items()):
+        if database is None or dict(key).get('database') == database:
+            pool.close_idle()
+
+
+def pool_stats():
+    return {pool.name: pool.stats() for pool in list(pools.values())}
@@ -0,0 +1,106 @@
+# Libs imports
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Whether the reads of the current request may go to a replica. Off outside
+# of requests, so commands, consumers and shells always read the primary.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    """Send the reads allowed by ``ReplicaMiddleware`` to a random replica.
+
+    Writes, reads inside a transaction and reads after a write of the same
+    request go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (settings.REPLICA_DATABASES and replica_reads.get()
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        replica_reads.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        return True
+
+
+def pin_key(request):
+    """Cache key pinning the reads of the client of a request to the primary."""
+    credential = (request.META.get('HTTP_AUTHORIZATION')
+                  or request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    if not credential:
+        return None
+    return 'replica_pin:' + hashlib.sha256(credential.encode('utf-8')).hexdigest()
+
+
+class ReplicaMiddleware:
+    """Allow the reads of GET, HEAD and OPTIONS requests to use the replicas.
+
+    Other requests read and write the primary, and pin the reads of their
+    client (by token or session) to the primary for ``REPLICA_PIN_TIMEOUT``
+    seconds, so clients read their own writes while the replicas catch up.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Mark the instance as a coroutine function, like MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        token = replica_reads.set(self.use_replicas(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+
+        use_replicas = await sync_to_async(self.use_replicas, thread_sensitive=False)(request)
+        token = replica_reads.set(use_replicas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        await sync_to_async(self.pin, thread_sensitive=False)(request)
+        return response
+
+    def use_replicas(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        key = pin_key(request)
+        return not (key and cache.get(key))
+
+    def pin(self, request):
+        # Pinned once the response is ready, so the timeout counts from the
+        # commit of the writes
+        key = pin_key(request)
+        if request.method not in SAFE_METHODS and key:
+            cache.set(key, True, settings.REPLICA_PIN_TIMEOUT)
@@ -0,0 +1,64 @@
+# Libs imports
+from asgiref.sync import sync_to_async
+
+# Django imports
+import django
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI handler reading the streaming responses off the event loop.
+
+    Django 3.2 iterates a StreamingHttpResponse on the event loop, where the
+    queries of the exports raise SynchronousOnlyOperation once the headers
+    are sent. Each part is pulled through sync_to_async instead, on Django's
+    sync thread, so the server-side cursor of an export keeps one connection.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.response_headers(response),
+        })
+        try:
+            async for part in iterate_in_thread(response):
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+    def response_headers(self, response):
+        # Same encoding as ASGIHandler.send_response
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        return headers
+
+
+async def iterate_in_thread(iterable):
+    """Async iterator over ``iterable``, each item read on Django's sync thread."""
+    iterator = iter(iterable)
+    done = object()
+    read = sync_to_async(next, thread_sensitive=True)
+    while True:
+        item = await read(iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def get_asgi_application():
+    """Like django.core.asgi.get_asgi_application, with StreamingASGIHandler."""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,133 @@
+# Libs imports
+import asyncio
+import contextvars
+import math
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+METRICS = ('queries', 'sql_ms', 'serializer_ms', 'total_ms')
+
+current_metrics = contextvars.ContextVar('current_metrics', default=None)
+
+
+class PerformanceMiddleware:
+    """Record the SQL queries, SQL time, serializer time and latency per view.
+
+    Samples are kept in a ring buffer of ``PERF_SAMPLE_SIZE`` entries per URL
+    name in the default cache, so ``manage.py perf_report`` can read the
+    figures of every worker. Under ASGI the queries are counted by the
+    threads running the views, see ``instrument_queries``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Mark the instance as a coroutine function, like MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.PERF_INSTRUMENTATION:
+            return self.get_response(request)
+
+        metrics = {'queries': 0, 'sql_ms': 0.0, 'serializer_ms': 0.0}
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with instrument_queries():
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.record(request, metrics, start)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.PERF_INSTRUMENTATION:
+            return await self.get_response(request)
+
+        metrics = {'queries': 0, 'sql_ms': 0.0, 'serializer_ms': 0.0}
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        await sync_to_async(self.record, thread_sensitive=False)(request, metrics, start)
+        return response
+
+    def record(self, request, metrics, start):
+        metrics['total_ms'] = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        if match is not None and match.url_name:
+            record_sample(match.url_name, metrics)
+
+
+@contextmanager
+def instrument_queries():
+    """Add the queries of this thread's connection to the request metrics."""
+    if current_metrics.get() is None:
+        yield
+        return
+    with connection.execute_wrapper(time_query):
+        yield
+
+
+def time_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics['queries'] += 1
+            metrics['sql_ms'] += (time.perf_counter() - start) * 1000
+
+
+class TimedSerializerMixin:
+    """Add the time spent in to_representation to the request metrics."""
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().to_representation(instance)
+
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics['serializer_ms'] += (time.perf_counter() - start) * 1000
+
+
+def record_sample(view_name, metrics):
+    counter_key = f'perf:{view_name}:counter'
+    cache.add(counter_key, 0, None)
+    try:
+        position = cache.incr(counter_key)
+    except ValueError:
+        # The counter was just evicted, or the cache does not store anything
+        return
+    slot = position % settings.PERF_SAMPLE_SIZE
+    sample = tuple(round(metrics[name], 3) for name in METRICS)
+    cache.set(f'perf:{view_name}:{slot}', sample, None)
+
+
+def get_samples(view_name):
+    keys = [f'perf:{view_name}:{slot}' for slot in range(settings.PERF_SAMPLE_SIZE)]
+    return list(cache.get_many(keys).values())
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
@@ -0,0 +1,182 @@
+# Libs imports
+import datetime
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+# Project imports
+from loan_manager.db_router import replica_reads
+
+
+def data_version_key(namespace, user_id=None):
+    scope = user_id if user_id is not None else 'all'
+    return f'data_version:{namespace}:{scope}'
+
+
+def new_data_version():
+    # A random token, so an evicted version never matches old entries,
+    # prefixed by its creation time for the Last-Modified headers
+    return f'{int(time.time())}-{uuid.uuid4().hex}'
+
+
+def data_version_time(version):
+    """Time a version token was created at, None for untimed tokens."""
+    created, _, _ = version.partition('-')
+    if not created.isdigit():
+        return None
+    return datetime.datetime.fromtimestamp(int(created), datetime.timezone.utc)
+
+
+def get_data_version(namespace, user_id=None):
+    """Current version token of the data a user (or an admin) can see."""
+    key = data_version_key(namespace, user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_data_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(namespace, user_id):
+    """Invalidate the cached responses of a user and of the admins.
+
+    The bump runs after the commit, and the reads of the following seconds
+    go to the primary (see ``request_data_version``), so no response built
+    from data older than the write can be cached under the new version.
+    """
+    def bump():
+        for key in (data_version_key(namespace, user_id),
+                    data_version_key(namespace)):
+            cache.set(key, new_data_version(), None)
+    transaction.on_commit(bump)
+
+
+def recently_bumped(version):
+    """Whether the replicas may still lack the writes behind a version.
+
+    The versions are timed in whole seconds, hence the extra second.
+    """
+    created = data_version_time(version)
+    if created is None:
+        return True
+    return time.time() - created.timestamp() < settings.REPLICA_PIN_TIMEOUT + 1
+
+
+def request_data_version(request, namespace):
+    """Data version of what the user of a request can see, read once per request.
+
+    A response built from a replica lacking the writes behind the version
+    would be cached and tagged under it, for every client. So after a
+    recent bump the reads of the request go to the primary, whoever wrote.
+    """
+    versions = getattr(request, '_data_versions', None)
+    if versions is None:
+        versions = request._data_versions = {}
+    if namespace not in versions:
+        user = request.user
+        version = get_data_version(namespace, None if user.is_admin else user.pk)
+        if version is not None and recently_bumped(version):
+            replica_reads.set(False)
+        versions[namespace] = version
+    return versions[namespace]
+
+
+def response_cache_key(request, endpoint, namespace):
+    user = request.user
+    version = request_data_version(request, namespace)
+    path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f'response:{endpoint}:{user.pk}:{version}:{path}'
+
+
+def cache_response(endpoint, namespace='transactions', timeout=None):
+    """Cache the successful responses of a view handler.
+
+    Entries are keyed by user, endpoint, full path and the data version of
+    the ``namespace``, which is bumped whenever the underlying rows change.
+    """
+    if timeout is None:
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = response_cache_key(request, endpoint, namespace)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_response(validator, namespace='transactions'):
+    """Answer conditional GETs of a view handler without running it.
+
+    ``validator(view, request, *args, **kwargs)`` returns a version of what
+    the handler would return and its last modification time (or None), or
+    None when they can't be known cheaply. Requests whose If-None-Match or
+    If-Modified-Since headers match get a 304 response, and successful
+    responses carry the strong ETag and the Last-Modified headers. The data
+    version of the ``namespace`` is read first, so that the validator reads
+    the primary after a recent bump.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            request_data_version(request, namespace)
+            validators = validator(view, request, *args, **kwargs)
+            if validators is None:
+                return handler(view, request, *args, **kwargs)
+
+            version, last_modified = validators
+            # Responses also vary by path (pages, filters), format and user
+            etag = hashlib.md5(':'.join([
+                str(version),
+                request.get_full_path(),
+                request.META.get('HTTP_ACCEPT', ''),
+                str(request.user.pk),
+            ]).encode('utf-8')).hexdigest()
+            etag = quote_etag(etag)
+            if last_modified is not None:
+                last_modified = int(last_modified.timestamp())
+
+            response = get_conditional_response(request,
+                                                etag=etag,
+                                                last_modified=last_modified)
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
+
+
+def data_version_validator(namespace='transactions'):
+    """Validator of ``conditional_response`` from the data version of a user.
+
+    Without a cache storing the versions there is nothing to compare with,
+    and the responses are always built.
+    """
+    def validator(view, request, *args, **kwargs):
+        version = request_data_version(request, namespace)
+        if version is None:
+            return None
+        return version, data_version_time(version)
+    return validator
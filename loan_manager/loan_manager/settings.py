@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 import os
 import sys
 # from decouple import Config, RepositoryEnv
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -52,15 +52,49 @@ INSTALLED_APPS = [
     'channels'
 ]
 
+# JSON library of the API renderer and parser: orjson, or json (DRF's own)
+API_JSON = config('API_JSON', default='orjson')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-    ]
+        'account.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        ('transactions.api.renderers.ORJSONRenderer' if API_JSON == 'orjson'
+         else 'rest_framework.renderers.JSONRenderer'),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        ('transactions.api.parsers.ORJSONParser' if API_JSON == 'orjson'
+         else 'rest_framework.parsers.JSONParser'),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Cached token authentication: TTLs (seconds) of the shared and the
+# in-process caches, and the number of tokens kept in each process. A token
+# deleted or an account deactivated can still authenticate on the other
+# worker processes for up to TOKEN_LOCAL_CACHE_TIMEOUT seconds.
+TOKEN_CACHE_TIMEOUT = config('TOKEN_CACHE_TIMEOUT', default=300, cast=int)
+TOKEN_LOCAL_CACHE_TIMEOUT = config('TOKEN_LOCAL_CACHE_TIMEOUT', default=10, cast=int)
+TOKEN_LOCAL_CACHE_SIZE = config('TOKEN_LOCAL_CACHE_SIZE', default=10000, cast=int)
+
+# Pagination of the list endpoints (page_size query parameter is capped)
+PAGE_SIZE = config('PAGE_SIZE', default=50, cast=int)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=500, cast=int)
+
+# Threads (and database connections) per ASGI worker serving the async views
+ASYNC_VIEW_THREADS = config('ASYNC_VIEW_THREADS', default=20, cast=int)
+
+# Rows fetched per round trip by the streaming exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
 AUTH_USER_MODEL = 'account.Account'
 
 MIDDLEWARE = [
+    'loan_manager.perf.PerformanceMiddleware',
+    'loan_manager.db_router.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +104,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view query count and latency samples, reported by manage.py perf_report.
+# Off by default, as every sample costs a few cache writes per request.
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=False, cast=bool)
+PERF_SAMPLE_SIZE = config('PERF_SAMPLE_SIZE', default=1000, cast=int)
+
 ROOT_URLCONF = 'loan_manager.urls'
 
 TEMPLATES = [
@@ -94,17 +133,53 @@ WSGI_APPLICATION = 'loan_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# Connections come from a pool per process (loan_manager/db_pool) holding up
+# to DB_POOL_MAX_SIZE connections, and go back to it at the end of each
+# request. DB_POOL_MAX_SIZE=0 disables the pool, then DB_CONN_MAX_AGE keeps
+# the connection of each thread open between requests.
+# Each thread holds one connection, so the default fits the threads of an
+# ASGI worker: the ASYNC_VIEW_THREADS, plus Django's sync thread, which also
+# runs the database_sync_to_async calls of the consumers. Every worker
+# process has its own pool, see DB_MAX_CONNECTIONS in gunicorn.conf.py.
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=ASYNC_VIEW_THREADS + 1, cast=int)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': ('loan_manager.db_pool' if DB_POOL_MAX_SIZE
+                   else 'django.db.backends.postgresql'),
         'NAME': config('DB_NAME', default='loan_manager_db'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'POOL': {
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            # Seconds a request waits for a free connection
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            # Idle seconds after which a connection is checked before use
+            'CHECK_AFTER': config('DB_POOL_CHECK_AFTER', default=30, cast=float),
+            # Seconds after which a connection is replaced
+            'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+        },
     }
 }
 
+# Read replicas as comma separated host[:port] entries, using the name and
+# credentials of the primary. The reads of GET requests go to a random one.
+REPLICA_DATABASES = []
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv())):
+    replica_host, _, replica_port = replica.partition(':')
+    DATABASES[f'replica_{index}'] = dict(DATABASES['default'],
+                                         HOST=replica_host,
+                                         PORT=replica_port or DATABASES['default']['PORT'])
+    REPLICA_DATABASES.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['loan_manager.db_router.ReplicaRouter']
+
+# Seconds the reads of a client stay on the primary after it writes
+REPLICA_PIN_TIMEOUT = config('REPLICA_PIN_TIMEOUT', default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -146,10 +221,18 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Lifetime of the cached API responses, which are invalidated on writes
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60 * 60 * 6, cast=int)
+
 # Redis
 if 'test' in sys.argv:
     CHANNEL_LAYERS = {}
 
+    # Second local database, used as a replica by the routing tests only
+    DATABASES['replica'] = dict(DATABASES['default'],
+                                TEST={'NAME': 'test_loan_manager_replica'})
+    REPLICA_DATABASES = []
+
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
@@ -160,10 +243,10 @@ else:
         "default": {
             "BACKEND": "channels_redis.core.RedisChannelLayer",
             "CONFIG": {
-                "hosts": (
+                "hosts": [(
                     config('REDIS_HOST', default='localhost'),
-                    config('REDIS_PORT', default='6379')
-                ),
+                    config('REDIS_PORT', default=6379, cast=int)
+                )],
             },
         },
     }
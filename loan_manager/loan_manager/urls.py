@@ -4,6 +4,9 @@ from django.urls import path, include
 from rest_framework import routers
 from rest_framework.authtoken.views import obtain_auth_token
 
+# Project imports
+from loan_manager.views import DatabasePoolStats
+
 # Account app imports
 from account.api import viewsets as account_viewsets
 
@@ -17,6 +20,10 @@ urlpatterns = [
     path('login/',
          obtain_auth_token, name='login'),
 
+    # Internal metrics
+    path('internal/db_pool/',
+         DatabasePoolStats.as_view(), name='db_pool_stats'),
+
     # Apps urls
     path('',
          include('transactions.urls')),
@@ -0,0 +1,19 @@
+# Libs imports
+import os
+
+# Django imports
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Project imports
+from account.permissions import IsAdmin
+from loan_manager.db_pool.pool import pool_stats
+
+
+class DatabasePoolStats(APIView):
+    """Connection pool metrics of the worker process serving the request."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, format=None):
+        return Response({'pid': os.getpid(), 'pools': pool_stats()})
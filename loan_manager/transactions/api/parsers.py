@@ -0,0 +1,49 @@
+# Libs imports
+import codecs
+
+import orjson
+
+# Django imports
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decoding with orjson.
+
+    Like the strict JSONParser, NaN and Infinity are rejected.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline delimited JSON into a lazy iterator of objects."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return self.iter_objects(stream, encoding)
+
+    def iter_objects(self, stream, encoding):
+        for number, line in enumerate(stream, start=1):
+            try:
+                line = line.decode(encoding).strip()
+                if not line:
+                    continue
+                row = orjson.loads(line)
+            except (UnicodeDecodeError, ValueError) as exc:
+                raise ParseError(f'NDJSON parse error on line {number} - {exc}')
+            yield row
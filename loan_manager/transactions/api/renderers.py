@@ -0,0 +1,111 @@
+# Libs imports
+import csv
+import decimal
+import json
+
+import orjson
+
+# Django imports
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson, producing the same bytes.
+
+    Types orjson doesn't encode like DRF (Decimals, dates, times) go
+    through DRF's encoder. Python and orjson write floats of 1e16 and more
+    (or under 1e-4) with different exponents, so data with such Decimals is
+    encoded by JSONRenderer, as are the indented and ASCII-only outputs.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (self.get_indent(accepted_media_type, renderer_context) is not None
+                or self.ensure_ascii or not self.compact):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = JSONEncoder()
+        # Values orjson can't write like the stdlib, found while encoding
+        unsupported = []
+
+        def default(obj):
+            if type(obj) is not decimal.Decimal:
+                return encoder.default(obj)
+            value = float(obj)
+            if value and not 1e-4 <= abs(value) < 1e16:
+                unsupported.append(value)
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Integers over 64 bits, among others
+            unsupported.append(None)
+        if unsupported:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer, so the JSON is a strict JavaScript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class StreamingRenderer(BaseRenderer):
+    """Renderer encoding rows one batch at a time for streaming responses.
+
+    ``render`` is only used for the error responses of the views, the rows
+    are encoded by ``render_rows``.
+    """
+    charset = 'utf-8'
+    batch_size = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.render_rows(list(data), [list(data.values())]))
+
+    def render_rows(self, header, rows):
+        """Yield the encoded header and rows, ``batch_size`` rows per chunk."""
+        lines = [self.encode_header(header)]
+        for row in rows:
+            lines.append(self.encode_row(header, row))
+            if len(lines) >= self.batch_size:
+                yield ''.join(lines).encode(self.charset)
+                lines = []
+        if lines:
+            yield ''.join(lines).encode(self.charset)
+
+    def encode_header(self, header):
+        return ''
+
+    def encode_row(self, header, row):
+        raise NotImplementedError
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    class Echo:
+        def write(self, value):
+            return value
+
+    def __init__(self):
+        self.writer = csv.writer(self.Echo())
+
+    def encode_header(self, header):
+        return self.writer.writerow(header)
+
+    def encode_row(self, header, row):
+        return self.writer.writerow(row)
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def encode_row(self, header, row):
+        return json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
@@ -5,11 +5,14 @@ from ipware import get_client_ip
 # Django imports
 from rest_framework import serializers
 
+# Project imports
+from loan_manager.perf import TimedSerializerMixin
+
 # Transactions app imports
 from transactions.models import Loan, Payment
 
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     end_date = serializers.DateField()
     interest_type = serializers.IntegerField()
     full_debt = serializers.SerializerMethodField('get_full_debt')
@@ -30,25 +33,27 @@ class LoanSerializer(serializers.ModelSerializer):
                   'client',
                   'full_debt',
                   'total_paid',
-                  'outstanding_balance']
+                  'outstanding_balance',
+                  'status']
         read_only_fields = ['id',
                             'user_account',
                             'ip_address',
-                            'request_date']
+                            'request_date',
+                            'status']
 
     def get_full_debt(self, obj):
-        return obj.get_full_debt
+        return getattr(obj, 'computed_full_debt', obj.full_debt)
 
     def get_total_paid(self, obj):
-        return obj.get_total_paid
+        return getattr(obj, 'computed_total_paid', obj.total_paid)
 
     def get_outstanding_balance(self, obj):
-        return obj.get_outstanding_balance
+        return getattr(obj, 'computed_outstanding_balance', obj.outstanding_balance)
 
     def validate(self, data):
         instance = getattr(self, 'instance', None)
         if instance:
-            if data['nominal_value'] < instance.get_total_paid:
+            if data['nominal_value'] < instance.total_paid:
                 raise serializers.ValidationError(
                     {'detail': "The nominal value can't be less than the total paid."}
                 )
@@ -98,15 +103,23 @@ class LoanSerializer(serializers.ModelSerializer):
             return instance
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # The loan row stays locked until the payment is saved, so concurrent
+    # payments to the same loan are validated one at a time. Writes must run
+    # inside transaction.atomic.
+    loan = serializers.PrimaryKeyRelatedField(queryset=Loan.objects.select_for_update())
+
     class Meta:
         model = Payment
-        fields = '__all__'
+        fields = ['id',
+                  'loan',
+                  'date',
+                  'value']
 
     def validate(self, data):
         instance = getattr(self, 'instance', None)
-        total_paid = data['loan'].get_total_paid
-        full_debt = data['loan'].get_full_debt
+        total_paid = data['loan'].total_paid
+        full_debt = data['loan'].full_debt
         if instance:
             value_difference = data['value'] - instance.value
             total_paid += value_difference
@@ -159,3 +172,63 @@ class PaymentSerializer(serializers.ModelSerializer):
         instance.value = validated_data['value']
         instance.save()
         return instance
+
+
+def decimal_string(value):
+    # The database returns the values with the field's decimal places, so
+    # this matches serializers.DecimalField without quantizing again
+    return format(value, 'f')
+
+
+def date_string(value):
+    return value.isoformat()
+
+
+class ReadSerializer:
+    """Output of a model serializer built from ``.values()`` rows.
+
+    For the list endpoints, which skip the field machinery of DRF. The rows
+    are read with ``values(*fields)`` and ``formats`` convert the values the
+    model serializer renders as strings; the others are output as read.
+    """
+    fields = []
+    formats = {}
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.fields)
+
+    @property
+    def data(self):
+        return self.to_representation(self.rows)
+
+    def to_representation(self, rows):
+        formats = self.formats.items()
+        data = []
+        for row in rows:
+            row = row.copy()
+            for name, to_string in formats:
+                value = row[name]
+                if value is not None:
+                    row[name] = to_string(value)
+            data.append(row)
+        return data
+
+
+class LoanReadSerializer(TimedSerializerMixin, ReadSerializer):
+    """Same output as LoanSerializer, from the stored balances."""
+    fields = LoanSerializer.Meta.fields
+    formats = {'nominal_value': decimal_string,
+               'interest_rate': decimal_string,
+               'request_date': date_string,
+               'end_date': date_string}
+
+
+class PaymentReadSerializer(TimedSerializerMixin, ReadSerializer):
+    """Same output as PaymentSerializer."""
+    fields = PaymentSerializer.Meta.fields
+    formats = {'date': date_string,
+               'value': decimal_string}
@@ -0,0 +1,122 @@
+# Django imports
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+# Project imports
+from loan_manager.response_cache import bump_data_version
+
+# Transactions app imports
+from transactions import events
+from transactions.models import Loan, Payment
+
+
+class PaymentRowSerializer(serializers.Serializer):
+    """Field level validation of one row of a bulk payment request."""
+    loan = serializers.IntegerField()
+    date = serializers.DateField()
+    value = serializers.DecimalField(max_digits=14,
+                                     decimal_places=2)
+
+    def validate_value(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("The value needs to be greater than zero.")
+        return value
+
+
+def create_payments(rows, user, chunk_size=5000):
+    """Validate and insert payments, returning the result of each row.
+
+    The rows are validated first. Then every loan they pay is locked in
+    primary key order, so concurrent requests paying the same loans wait
+    for each other instead of deadlocking. The payments are inserted in
+    chunks inside a single transaction. The running totals of each loan are
+    checked in memory, so rejected rows never count towards its total paid.
+    """
+    row_serializer = PaymentRowSerializer()
+    results = []
+    valid_rows = []
+    for index, row in enumerate(rows):
+        try:
+            if not isinstance(row, dict):
+                raise serializers.ValidationError(
+                    {'detail': 'Each payment needs to be a JSON object.'}
+                )
+            data = row_serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            results.append({'index': index, 'errors': exc.detail})
+            continue
+        results.append(None)
+        valid_rows.append((index, data))
+
+    with transaction.atomic():
+        loans = _lock_loans({data['loan'] for _, data in valid_rows}, chunk_size)
+        payments = []
+        for start in range(0, len(valid_rows), chunk_size):
+            payments.extend(
+                _create_chunk(valid_rows[start:start + chunk_size], loans, user, results)
+            )
+
+        if payments:
+            # Queued before the events, as a hook that raises skips the
+            # hooks queued after it
+            bump_data_version('transactions', user.pk)
+            events.publish_bulk_payments(payments)
+    return results
+
+
+def _lock_loans(loan_ids, chunk_size):
+    """Lock the loans in primary key order, ``chunk_size`` at a time."""
+    loan_ids = sorted(loan_ids)
+    loans = {}
+    for start in range(0, len(loan_ids), chunk_size):
+        chunk = (Loan.objects.select_for_update()
+                             .filter(pk__in=loan_ids[start:start + chunk_size])
+                             .order_by('pk'))
+        loans.update((loan.pk, loan) for loan in chunk)
+    return loans
+
+
+def _create_chunk(rows, loans, user, results):
+    payments = []
+    paid_loans = {}
+    for index, data in rows:
+        loan = loans.get(data['loan'])
+        error = _validate_payment(loan, user, data)
+        if error:
+            results[index] = {'index': index, 'errors': {'detail': error}}
+            continue
+        loan.total_paid += data['value']
+        loan.outstanding_balance -= data['value']
+        loan.status = Loan.compute_status(loan.outstanding_balance, loan.end_date)
+        if loan.pk not in paid_loans:
+            loan.version += 1
+            loan.updated_at = timezone.now()
+        paid_loans[loan.pk] = loan
+        payments.append((index, Payment(loan=loan,
+                                        date=data['date'],
+                                        value=data['value'])))
+
+    Payment.objects.bulk_create([payment for _, payment in payments])
+    Loan.objects.bulk_update(paid_loans.values(), ['total_paid',
+                                                   'outstanding_balance',
+                                                   'status',
+                                                   'version',
+                                                   'updated_at'])
+    for index, payment in payments:
+        results[index] = {'index': index, 'id': payment.pk}
+    return [payment for _, payment in payments]
+
+
+def _validate_payment(loan, user, data):
+    if loan is None:
+        return 'The loan does not exist.'
+    if loan.user_account_id != user.pk:
+        return "You need to be the loan's user."
+    if loan.total_paid + data['value'] > loan.full_debt:
+        return 'The total paid needs to be less or equal than the full debt.'
+    if data['date'] < loan.request_date:
+        return "The date needs to be equal or greater than the loan's request date."
+    if data['date'] > loan.end_date:
+        return "The date needs to be equal or less than the loan's end date."
+    return None
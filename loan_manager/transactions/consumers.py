@@ -0,0 +1,81 @@
+# Libs imports
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+# Transactions app imports
+from transactions.events import user_group
+from transactions.models import Loan
+
+
+class LoanBalanceConsumer(AsyncJsonWebsocketConsumer):
+    """Push the payment events and balances of the loans of a user.
+
+    After connecting with a token, the client sends
+    ``{"action": "subscribe", "loans": [1, 2]}`` (or no ``loans`` for all
+    of its loans) and receives the current balances, then one event for
+    every payment created, updated or deleted on those loans.
+    ``{"action": "unsubscribe", "loans": [...]}`` stops them.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.user = user
+        self.all_loans = False
+        self.loan_ids = set()
+        self.group_name = user_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get('action') if isinstance(content, dict) else None
+        loans = content.get('loans') if action else None
+        if loans is not None and (not isinstance(loans, list)
+                                  or not all(isinstance(pk, int) for pk in loans)):
+            await self.send_json({'error': 'loans needs to be a list of loan ids.'})
+            return
+
+        if action == 'subscribe':
+            balances = await self.get_balances(loans)
+            if loans is None:
+                self.all_loans = True
+            self.loan_ids.update(balance['loan'] for balance in balances)
+            await self.send_json({'event': 'subscribed', 'loans': balances})
+        elif action == 'unsubscribe':
+            # Loans created after a subscription to all of them are left out
+            # once some are unsubscribed
+            self.all_loans = False
+            if loans is None:
+                self.loan_ids.clear()
+            else:
+                self.loan_ids.difference_update(loans)
+            await self.send_json({'event': 'unsubscribed', 'loans': sorted(self.loan_ids)})
+        else:
+            await self.send_json({'error': 'Unknown action.'})
+
+    async def payment_event(self, message):
+        if self.all_loans or message['loan'] in self.loan_ids:
+            await self.send_json(message['data'])
+
+    async def payment_events(self, message):
+        # The events of many loans, sent in one message by the bulk endpoint
+        for event in message['events']:
+            await self.payment_event(event)
+
+    @database_sync_to_async
+    def get_balances(self, loans):
+        # Only the loans of the user, ids of other loans are left out
+        queryset = Loan.objects.filter(user_account=self.user).order_by('pk')
+        if loans is not None:
+            queryset = queryset.filter(pk__in=loans)
+        return [{'loan': loan['pk'],
+                 'total_paid': str(loan['total_paid']),
+                 'outstanding_balance': str(loan['outstanding_balance'])}
+                for loan in queryset.values('pk', 'total_paid', 'outstanding_balance')]
@@ -0,0 +1,45 @@
+# Libs imports
+import datetime
+
+# Django imports
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Project imports
+from loan_manager.response_cache import bump_data_version
+
+# Transactions app imports
+from transactions.models import Loan
+
+
+def scan_delinquency(today=None, batch_size=10000):
+    """Mark the open loans past their end date as overdue.
+
+    The loans due before ``today`` are read from the partial index of the
+    open loans and updated ``batch_size`` at a time, each batch in its own
+    transaction. Marked loans leave the index, so a scan only reads the
+    loans that became overdue since the previous one. Returns the number
+    of loans marked.
+    """
+    today = today or datetime.date.today()
+    marked = 0
+    while True:
+        with transaction.atomic():
+            rows = list(Loan.objects.select_for_update(skip_locked=True)
+                                    .filter(status=Loan.Status.OPEN, end_date__lt=today)
+                                    .order_by('end_date', 'id')
+                                    .values_list('id', 'user_account_id')[:batch_size])
+            if not rows:
+                return marked
+
+            Loan.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                status=Loan.Status.OVERDUE,
+                version=F('version') + 1,
+                updated_at=timezone.now()
+            )
+            for user_id in {user_id for _, user_id in rows}:
+                bump_data_version('transactions', user_id)
+        marked += len(rows)
+        if len(rows) < batch_size:
+            return marked
@@ -0,0 +1,125 @@
+# Libs imports
+import logging
+from functools import wraps
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+# Django imports
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_CREATED = 'payment_created'
+PAYMENT_UPDATED = 'payment_updated'
+PAYMENT_DELETED = 'payment_deleted'
+PAYMENTS_CREATED = 'payments_created'
+
+
+def user_group(user_id):
+    """Channel layer group of the WebSocket connections of a user."""
+    return f'loans.user.{user_id}'
+
+
+def publish_payment_event(event, payment, loan_id=None):
+    """Send a payment event with the new balances of its loan after the commit.
+
+    ``loan_id`` overrides the loan of the payment, for the loan a payment
+    was moved away from. Nothing is sent without a channel layer.
+    """
+    if get_channel_layer() is None:
+        return
+    loan_id = loan_id or payment.loan_id
+    payment_data = {
+        'id': payment.pk,
+        'loan': loan_id,
+        'date': payment.date.isoformat(),
+        'value': str(payment.value),
+    }
+    transaction.on_commit(lambda: _send_balance(event, loan_id, {'payment': payment_data}))
+
+
+def publish_bulk_payments(payments):
+    """Send the events of payments inserted without signals after the commit.
+
+    There is one ``payments_created`` event per loan. The balances of all
+    the loans are read with one query, and each user gets a single message
+    carrying the events of its loans.
+    """
+    if get_channel_layer() is None or not payments:
+        return
+    per_loan = {}
+    for payment in payments:
+        per_loan.setdefault(payment.loan_id, []).append(payment.pk)
+    transaction.on_commit(lambda: _send_bulk_balances(PAYMENTS_CREATED, per_loan))
+
+
+def _log_failures(send):
+    """Log the errors of an event hook instead of raising them.
+
+    The hooks run after the commit, where an error (say, Redis being down)
+    would turn a saved write into a 500 and skip the hooks queued after it.
+    """
+    @wraps(send)
+    def wrapper(event, *args):
+        try:
+            send(event, *args)
+        except Exception:
+            logger.exception('Could not send the %s event.', event)
+    return wrapper
+
+
+@_log_failures
+def _send_bulk_balances(event, per_loan):
+    # Transactions app imports
+    from transactions.models import Loan
+
+    loans = (Loan.objects.filter(pk__in=per_loan)
+                         .order_by('pk')
+                         .values('pk', 'user_account_id', 'total_paid', 'outstanding_balance'))
+    per_user = {}
+    for loan in loans:
+        per_user.setdefault(loan['user_account_id'], []).append({
+            'loan': loan['pk'],
+            'data': {
+                'event': event,
+                'loan': loan['pk'],
+                'payments': per_loan[loan['pk']],
+                'total_paid': str(loan['total_paid']),
+                'outstanding_balance': str(loan['outstanding_balance']),
+            },
+        })
+
+    channel_layer = get_channel_layer()
+    for user_id, loan_events in per_user.items():
+        async_to_sync(channel_layer.group_send)(user_group(user_id), {
+            'type': 'payment.events',
+            'events': loan_events,
+        })
+
+
+@_log_failures
+def _send_balance(event, loan_id, data):
+    # Transactions app imports
+    from transactions.models import Loan
+
+    # The balances are read after the commit, so every event carries the
+    # latest committed balance even when writes to the loan interleave
+    loan = (Loan.objects.filter(pk=loan_id)
+                        .values('user_account_id', 'total_paid', 'outstanding_balance')
+                        .first())
+    if loan is None:
+        # The loan itself was deleted
+        return
+
+    async_to_sync(get_channel_layer().group_send)(user_group(loan['user_account_id']), {
+        'type': 'payment.event',
+        'loan': loan_id,
+        'data': {
+            'event': event,
+            'loan': loan_id,
+            **data,
+            'total_paid': str(loan['total_paid']),
+            'outstanding_balance': str(loan['outstanding_balance']),
+        },
+    })
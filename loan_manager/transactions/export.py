@@ -0,0 +1,54 @@
+# Django imports
+from django.conf import settings
+
+# Columns of the exports and the values read for them
+LOAN_COLUMNS = (
+    ('id', 'id'),
+    ('user_account', 'user_account_id'),
+    ('bank', 'bank'),
+    ('client', 'client'),
+    ('nominal_value', 'nominal_value'),
+    ('interest_type', 'interest_type'),
+    ('interest_rate', 'interest_rate'),
+    ('request_date', 'request_date'),
+    ('end_date', 'end_date'),
+    ('interest_value', 'computed_interest_value'),
+    ('full_debt', 'computed_full_debt'),
+    ('total_paid', 'computed_total_paid'),
+    ('outstanding_balance', 'computed_outstanding_balance'),
+    ('status', 'status'),
+)
+
+PAYMENT_COLUMNS = (
+    ('id', 'id'),
+    ('loan', 'loan_id'),
+    ('date', 'date'),
+    ('value', 'value'),
+)
+
+
+def export_rows(queryset, columns, chunk_size=None):
+    """Header and lazy row tuples of a queryset, read in primary key order.
+
+    The rows are fetched through a server-side cursor, ``chunk_size`` at a
+    time, so an export of any size keeps only one chunk in memory.
+    """
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+    header = [name for name, _ in columns]
+    # The rows are read while the response streams, after the request
+    # context is gone, so the database is chosen now
+    rows = (queryset.using(queryset.db)
+                    .order_by('pk')
+                    .values_list(*[value for _, value in columns])
+                    .iterator(chunk_size=chunk_size))
+    return header, rows
+
+
+def export_loans(loans, chunk_size=None):
+    """Loans with their financials computed by the database."""
+    return export_rows(loans.with_financials(), LOAN_COLUMNS, chunk_size)
+
+
+def export_payments(payments, chunk_size=None):
+    return export_rows(payments, PAYMENT_COLUMNS, chunk_size)
@@ -0,0 +1,149 @@
+# Libs imports
+import datetime
+
+# Django imports
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+# Transactions app imports
+from transactions.models import MAX_MATURING_DAYS, Loan
+
+# Shortest search term matched anywhere in the name, as the trigram index
+# has no trigrams to look up for shorter ones. Those match the prefix.
+MIN_SEARCH_LENGTH = 3
+
+
+def date_value(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError('Enter a date in the YYYY-MM-DD format.')
+
+
+def text_value(value):
+    # Postgres can't store or compare text with NUL characters
+    if '\x00' in value:
+        raise ValueError('Null characters are not allowed.')
+    return value
+
+
+def decimal_value(model_field):
+    """Parser of the values compared with a DecimalField of a model.
+
+    Values with more digits than the field holds are rejected, as the
+    database can't compare the largest ones with its column.
+    """
+    field = serializers.DecimalField(max_digits=model_field.max_digits,
+                                     decimal_places=model_field.decimal_places)
+
+    def parse(value):
+        try:
+            return field.to_internal_value(value)
+        except serializers.ValidationError as exc:
+            raise ValueError(exc.detail[0])
+    return parse
+
+
+def non_negative_integer_value(value):
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError('A valid integer is required.')
+    if value < 0:
+        raise ValueError('The value needs to be zero or greater.')
+    return value
+
+
+def days_value(value):
+    value = non_negative_integer_value(value)
+    if value > MAX_MATURING_DAYS:
+        raise ValueError(f'The value needs to be {MAX_MATURING_DAYS} or less.')
+    return value
+
+
+def choice_value(choices, to_python=str):
+    def parse(value):
+        try:
+            value = to_python(value)
+        except ValueError:
+            value = None
+        if value not in choices:
+            raise ValueError(f'Accepts: {", ".join(str(choice) for choice in choices)}.')
+        return value
+    return parse
+
+
+def search_client(queryset, term):
+    if len(term) < MIN_SEARCH_LENGTH:
+        return queryset.filter(client__istartswith=term)
+    return queryset.filter(client__icontains=term)
+
+
+class ListFilter:
+    """Filters and ordering of a listing, read from the query parameters.
+
+    ``filters`` maps each parameter to a parser of its value and either a
+    lookup or a ``function(queryset, value)``. ``orderings`` are the fields
+    the ordering parameter accepts, optionally prefixed by ``-``; the id
+    breaks the ties, so the ordering can be used by KeysetPagination.
+    Invalid values raise ParseError.
+    """
+    filters = {}
+    orderings = []
+    ordering_param = 'ordering'
+
+    def __init__(self, query_params):
+        self.query_params = query_params
+
+    def filter_queryset(self, queryset):
+        for name, (lookup, parse) in self.filters.items():
+            value = self.query_params.get(name)
+            if value is None:
+                continue
+            try:
+                value = parse(value)
+            except ValueError as exc:
+                raise ParseError(f'{name}: {exc}')
+            if callable(lookup):
+                queryset = lookup(queryset, value)
+            else:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+    def get_ordering(self, default):
+        ordering = self.query_params.get(self.ordering_param)
+        if ordering is None:
+            return default
+        name = ordering[1:] if ordering.startswith('-') else ordering
+        if name not in self.orderings:
+            raise ParseError(f'{self.ordering_param} accepts: {", ".join(self.orderings)}, '
+                             f'prefixed by - for the descending order.')
+        if name == 'id':
+            return (ordering,)
+        return (ordering, '-id' if ordering.startswith('-') else 'id')
+
+
+class LoanFilter(ListFilter):
+    filters = {
+        'bank': ('bank', text_value),
+        'client': (search_client, text_value),
+        'interest_type': ('interest_type', choice_value(Loan.InterestType.values, int)),
+        'status': ('status', choice_value(Loan.Status.values)),
+        'request_date_after': ('request_date__gte', date_value),
+        'request_date_before': ('request_date__lte', date_value),
+        'end_date_after': ('end_date__gte', date_value),
+        'end_date_before': ('end_date__lte', date_value),
+        'min_outstanding': ('outstanding_balance__gte',
+                            decimal_value(Loan._meta.get_field('outstanding_balance'))),
+        'maturing_in': (lambda loans, days: loans.maturing(days), days_value),
+    }
+    orderings = ['id', 'request_date', 'end_date', 'outstanding_balance']
+
+
+class PaymentFilter(ListFilter):
+    filters = {
+        'loan': ('loan', non_negative_integer_value),
+        'date_after': ('date__gte', date_value),
+        'date_before': ('date__lte', date_value),
+    }
+    orderings = ['id', 'date']
@@ -0,0 +1,262 @@
+# Libs imports
+import csv
+import datetime
+import io
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+# Django imports
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Project imports
+from loan_manager.response_cache import bump_data_version
+
+# Account app imports
+from account.models import Account
+
+# Transactions app imports
+from transactions.models import Loan, LoanImport
+
+CENT = Decimal('0.01')
+INTEREST_TYPES = frozenset(Loan.InterestType.values)
+
+# Columns written by COPY, in order
+COPY_COLUMNS = ('user_account_id',
+                'nominal_value',
+                'interest_rate',
+                'interest_type',
+                'request_date',
+                'end_date',
+                'bank',
+                'client',
+                'total_paid',
+                'full_debt',
+                'outstanding_balance',
+                'status')
+
+
+class RowError(Exception):
+    pass
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as source:
+        yield from csv.DictReader(source)
+
+
+def read_parquet(path, batch_size=65536):
+    import pyarrow.parquet
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+READERS = {
+    'csv': read_csv,
+    'parquet': read_parquet,
+}
+
+
+def _decimal(row, name, max_digits):
+    value = row.get(name)
+    if value is None or value == '':
+        raise RowError(f'{name}: This field is required.')
+    try:
+        value = Decimal(str(value).strip())
+        rounded = value.quantize(CENT)
+    except InvalidOperation:
+        raise RowError(f'{name}: A valid number is required.')
+    if not value.is_finite():
+        raise RowError(f'{name}: A valid number is required.')
+    if rounded != value:
+        raise RowError(f'{name}: Ensure that there are no more than 2 decimal places.')
+    if abs(rounded) >= 10 ** (max_digits - 2):
+        raise RowError(f'{name}: Ensure that there are no more than {max_digits} digits in total.')
+    return rounded
+
+
+def _date(row, name, default=None):
+    value = row.get(name)
+    if value is None or value == '':
+        if default is not None:
+            return default
+        raise RowError(f'{name}: This field is required.')
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError(f'{name}: Date has wrong format. Use the format YYYY-MM-DD.')
+
+
+def _text(row, name, max_length=100):
+    value = row.get(name)
+    value = '' if value is None else str(value).strip()
+    if not value:
+        raise RowError(f'{name}: This field may not be blank.')
+    # Postgres text can't hold them, and COPY would fail the whole batch
+    if '\x00' in value:
+        raise RowError(f'{name}: Null characters are not allowed.')
+    if len(value) > max_length:
+        raise RowError(f'{name}: Ensure this field has no more than {max_length} characters.')
+    return value
+
+
+def _integer(row, name):
+    value = row.get(name)
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise RowError(f'{name}: A valid integer is required.')
+
+
+def build_loan(row, accounts, today):
+    """Validate a row with the rules of LoanSerializer.
+
+    ``accounts`` is the set of existing account ids and the request date
+    defaults to ``today``. Returns the values of ``COPY_COLUMNS``; no Loan
+    instance is built, since that would cost more than the rest of the row.
+    """
+    user_account_id = _integer(row, 'user_account')
+    if user_account_id not in accounts:
+        raise RowError('user_account: The account does not exist.')
+
+    nominal_value = _decimal(row, 'nominal_value', 14)
+    if nominal_value <= 0:
+        raise RowError('nominal_value: The value needs to be greater than zero.')
+
+    interest_rate = _decimal(row, 'interest_rate', 5)
+    interest_type = _integer(row, 'interest_type')
+    if interest_type not in INTEREST_TYPES:
+        raise RowError(f'interest_type: "{interest_type}" is not a valid choice.')
+
+    request_date = _date(row, 'request_date', today)
+    end_date = _date(row, 'end_date')
+    if end_date <= request_date:
+        raise RowError('The end date needs to be greater than the request date.')
+
+    months_difference = ((end_date.year - request_date.year)
+                         * 12
+                         + (end_date.month - request_date.month))
+    full_debt = nominal_value + Loan.compute_interest_value(nominal_value,
+                                                            interest_rate,
+                                                            interest_type,
+                                                            months_difference)
+    return (user_account_id,
+            nominal_value,
+            interest_rate,
+            interest_type,
+            request_date,
+            end_date,
+            _text(row, 'bank'),
+            _text(row, 'client'),
+            0,
+            full_debt,
+            full_debt,
+            Loan.compute_status(full_debt, end_date, today))
+
+
+def copy_loans(rows):
+    """Insert rows of ``COPY_COLUMNS`` values with a single COPY.
+
+    The version and update time, which have no database defaults, are
+    written as their model defaults.
+    """
+    defaults = (1, timezone.now())
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(row + defaults for row in rows)
+    buffer.seek(0)
+
+    columns = ', '.join(COPY_COLUMNS + ('version', 'updated_at'))
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f'COPY {Loan._meta.db_table} ({columns}) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+
+
+class LoanImporter:
+    """Import the loans of a CSV or Parquet file in batches.
+
+    Every batch is inserted in its own transaction together with the
+    position of its last row in the ``LoanImport`` checkpoint, so an
+    interrupted import continues after the last committed batch. Rejected
+    rows are appended to the ``rejected_path`` CSV file with their line
+    number and the error.
+    """
+
+    def __init__(self, path, file_format=None, batch_size=10000, rejected_path=None):
+        if not os.path.isfile(path):
+            raise ValueError(f'File not found: {path}')
+        self.path = path
+        self.source = os.path.realpath(path)
+        self.file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+        if self.file_format not in READERS:
+            raise ValueError(f'Unsupported file format: {self.file_format}')
+        if self.file_format == 'parquet':
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise ValueError('Reading Parquet files requires pyarrow (pip install pyarrow).')
+        self.batch_size = batch_size
+        self.rejected_path = rejected_path or f'{path}.rejected.csv'
+
+    def run(self, restart=False):
+        checkpoint, _ = LoanImport.objects.get_or_create(source=self.source)
+        if restart:
+            checkpoint.reset()
+        if checkpoint.finished:
+            return checkpoint
+
+        self.truncate_rejected(checkpoint.position)
+        accounts = set(Account.objects.values_list('pk', flat=True))
+        today = datetime.date.today()
+        rows = islice(READERS[self.file_format](self.path), checkpoint.position, None)
+
+        with open(self.rejected_path, 'a', newline='', encoding='utf-8') as rejected_file:
+            rejected = csv.writer(rejected_file)
+            if rejected_file.tell() == 0:
+                rejected.writerow(['line', 'error', 'row'])
+
+            line = checkpoint.position
+            batch = list(islice(rows, self.batch_size))
+            while batch:
+                loans = []
+                for row in batch:
+                    line += 1
+                    try:
+                        loans.append(build_loan(row, accounts, today))
+                    except RowError as exc:
+                        rejected.writerow([line, str(exc), json.dumps(row, default=str)])
+                        checkpoint.rejected += 1
+                # Rejected rows reach the disk before their batch is committed
+                rejected_file.flush()
+
+                with transaction.atomic():
+                    copy_loans(loans)
+                    checkpoint.position = line
+                    checkpoint.imported += len(loans)
+                    checkpoint.save()
+                    for user_id in {loan[0] for loan in loans}:
+                        bump_data_version('transactions', user_id)
+                batch = list(islice(rows, self.batch_size))
+
+        checkpoint.finished = True
+        checkpoint.save()
+        return checkpoint
+
+    def truncate_rejected(self, position):
+        """Drop rejected rows after the checkpoint, left by a crashed batch."""
+        if not os.path.exists(self.rejected_path):
+            return
+        with open(self.rejected_path, newline='', encoding='utf-8') as rejected_file:
+            lines = list(csv.reader(rejected_file))
+        if not lines:
+            return
+        kept = [lines[0]] + [line for line in lines[1:] if int(line[0]) <= position]
+        with open(self.rejected_path, 'w', newline='', encoding='utf-8') as rejected_file:
+            csv.writer(rejected_file).writerows(kept)
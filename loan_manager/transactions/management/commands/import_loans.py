@@ -0,0 +1,51 @@
+# Libs imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Transactions app imports
+from transactions.imports import LoanImporter
+
+
+class Command(BaseCommand):
+    help = 'Import loans from a CSV or Parquet file, resuming an interrupted import'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file',
+                            help='CSV or Parquet file with the columns user_account, '
+                                 'nominal_value, interest_rate, interest_type, '
+                                 'request_date (optional), end_date, bank and client')
+        parser.add_argument('--format',
+                            choices=['csv', 'parquet'],
+                            help='File format, guessed from the extension by default')
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=10000,
+                            help='Rows inserted per transaction')
+        parser.add_argument('--rejected',
+                            help='CSV file receiving the rejected rows '
+                                 '(default: <file>.rejected.csv)')
+        parser.add_argument('--restart',
+                            action='store_true',
+                            help='Ignore the progress of previous runs of this file')
+
+    def handle(self, *args, **options):
+        try:
+            importer = LoanImporter(options['file'],
+                                    file_format=options['format'],
+                                    batch_size=options['batch_size'],
+                                    rejected_path=options['rejected'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        start = time.perf_counter()
+        checkpoint = importer.run(restart=options['restart'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{checkpoint.imported} loans imported, {checkpoint.rejected} rows rejected '
+            f'({checkpoint.position} rows read) in {elapsed:.1f}s.'
+        ))
+        if checkpoint.rejected:
+            self.stdout.write(f'Rejected rows written to {importer.rejected_path}.')
@@ -0,0 +1,33 @@
+# Django imports
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+# Project imports
+from loan_manager.perf import METRICS, get_samples, percentile
+
+
+class Command(BaseCommand):
+    help = 'Report p50/p95/p99 query count and timings recorded per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('views',
+                            nargs='*',
+                            help='URL names of the views (defaults to every named URL)')
+
+    def handle(self, *args, **options):
+        views = options['views'] or sorted(
+            name for name in get_resolver().reverse_dict if isinstance(name, str)
+        )
+        header = f'{"view":<24}{"samples":>8}' + ''.join(
+            f'{metric + " p" + str(rank):>18}' for metric in METRICS for rank in (50, 95, 99)
+        )
+        self.stdout.write(header)
+        for view in views:
+            samples = get_samples(view)
+            if not samples:
+                continue
+            line = f'{view:<24}{len(samples):>8}'
+            for index, _ in enumerate(METRICS):
+                values = [sample[index] for sample in samples]
+                line += ''.join(f'{percentile(values, rank):>18.2f}' for rank in (50, 95, 99))
+            self.stdout.write(line)
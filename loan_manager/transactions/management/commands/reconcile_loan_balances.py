@@ -0,0 +1,38 @@
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+# Transactions app imports
+from transactions.models import Loan
+
+
+class Command(BaseCommand):
+    help = 'Rebuild and verify the stored balances of the loans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check',
+                            action='store_true',
+                            help='Only verify the stored balances, without fixing them')
+
+    def handle(self, *args, **options):
+        mismatched = list(
+            Loan.objects.with_financials()
+                        .exclude(total_paid=F('computed_total_paid'),
+                                 full_debt=F('computed_full_debt'),
+                                 outstanding_balance=F('computed_outstanding_balance'))
+                        .values_list('pk', flat=True)
+        )
+
+        if options['check']:
+            if mismatched:
+                raise CommandError(f'{len(mismatched)} loans with wrong balances: {mismatched}')
+            self.stdout.write(self.style.SUCCESS('All loan balances are correct.'))
+            return
+
+        for pk in mismatched:
+            with transaction.atomic():
+                loan = Loan.objects.select_for_update().get(pk=pk)
+                loan.total_paid = loan.get_total_paid
+                loan.save()
+        self.stdout.write(self.style.SUCCESS(f'{len(mismatched)} loan balances rebuilt.'))
@@ -0,0 +1,13 @@
+# Django imports
+from django.core.management.base import BaseCommand
+
+# Transactions app imports
+from transactions.models import PortfolioSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the portfolio totals served by /analytics/portfolio/'
+
+    def handle(self, *args, **options):
+        PortfolioSummary.refresh()
+        self.stdout.write(self.style.SUCCESS('Portfolio summary refreshed.'))
@@ -0,0 +1,38 @@
+# Libs imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Transactions app imports
+from transactions.delinquency import scan_delinquency
+from transactions.models import MAX_MATURING_DAYS, Loan
+
+
+class Command(BaseCommand):
+    help = 'Mark the unpaid loans past their end date as overdue, meant to run daily'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=10000,
+                            help='Loans updated per transaction')
+        parser.add_argument('--maturing-in',
+                            type=int,
+                            default=30,
+                            help='Also count the open loans ending within this many days')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['maturing_in'] <= MAX_MATURING_DAYS:
+            raise CommandError(f'--maturing-in needs to be between 0 and {MAX_MATURING_DAYS}.')
+
+        start = time.perf_counter()
+        marked = scan_delinquency(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{marked} loans marked as overdue in {elapsed:.1f}s.'
+        ))
+        maturing = Loan.objects.maturing(options['maturing_in']).count()
+        self.stdout.write(f'{maturing} open loans end in the next '
+                          f'{options["maturing_in"]} days.')
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.18 on 2026-10-18 11:59
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_loan_balances(apps, schema_editor):
+    Loan = apps.get_model('transactions', 'Loan')
+    Payment = apps.get_model('transactions', 'Payment')
+    paid_per_loan = dict(Payment.objects.values('loan')
+                                        .annotate(total=Sum('value'))
+                                        .values_list('loan', 'total'))
+    for loan in Loan.objects.iterator():
+        interest_rate = loan.interest_rate/100
+        if loan.interest_type == 1:
+            interest_value = loan.nominal_value * interest_rate
+        else:
+            months_difference = ((loan.end_date.year - loan.request_date.year)
+                                 * 12
+                                 + (loan.end_date.month - loan.request_date.month))
+            interest_value = (loan.nominal_value
+                              * (1 + interest_rate)**months_difference)
+            interest_value -= loan.nominal_value
+        loan.total_paid = paid_per_loan.get(loan.pk) or 0
+        loan.full_debt = loan.nominal_value + round(interest_value, 2)
+        loan.outstanding_balance = loan.full_debt - loan.total_paid
+        loan.save(update_fields=['total_paid', 'full_debt', 'outstanding_balance'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_auto_20210331_0131'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='full_debt',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='outstanding_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='total_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.RunPython(fill_loan_balances,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_auto_20261018_1159'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['request_date', 'id'], name='loan_request_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['user_account', 'request_date', 'id'], name='loan_user_request_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['date', 'id'], name='payment_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['loan', 'date', 'id'], name='payment_loan_date_id_idx'),
+        ),
+    ]
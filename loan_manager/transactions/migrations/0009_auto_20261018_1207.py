@@ -0,0 +1,62 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+CREATE_PORTFOLIO_SUMMARY = '''
+CREATE MATERIALIZED VIEW transactions_portfolio_summary AS
+SELECT row_number() OVER (ORDER BY bank, client, interest_type, request_month) AS id,
+       summary.*,
+       now() AS refreshed_at
+  FROM (SELECT bank,
+               client,
+               interest_type,
+               date_trunc('month', request_date)::date AS request_month,
+               count(*) AS loans_count,
+               sum(nominal_value) AS nominal_value,
+               sum(full_debt) AS full_debt,
+               sum(total_paid) AS total_paid,
+               sum(outstanding_balance) AS outstanding_balance,
+               count(*) FILTER (WHERE end_date < current_date
+                                  AND outstanding_balance > 0) AS overdue_count
+          FROM transactions_loan
+         GROUP BY bank, client, interest_type, request_month) AS summary;
+
+CREATE UNIQUE INDEX transactions_portfolio_summary_key
+    ON transactions_portfolio_summary (bank, client, interest_type, request_month);
+'''
+
+DROP_PORTFOLIO_SUMMARY = 'DROP MATERIALIZED VIEW transactions_portfolio_summary;'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0008_auto_20261018_1201'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bank', models.CharField(max_length=100)),
+                ('client', models.CharField(max_length=100)),
+                ('interest_type', models.IntegerField(choices=[(1, 'Simple'), (2, 'Compound')])),
+                ('request_month', models.DateField()),
+                ('loans_count', models.IntegerField()),
+                ('nominal_value', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('full_debt', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('total_paid', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('overdue_count', models.IntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'transactions_portfolio_summary',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_PORTFOLIO_SUMMARY,
+                          DROP_PORTFOLIO_SUMMARY),
+    ]
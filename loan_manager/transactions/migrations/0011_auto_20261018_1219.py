@@ -0,0 +1,34 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transactions', '0010_auto_20261018_1214'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['loan', 'date', 'id'], include=('value',), name='payment_loan_date_value_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_loan_date_id_idx',
+        ),
+        migrations.AlterField(
+            model_name='loan',
+            name='user_account',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='loan',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='transactions.loan'),
+        ),
+    ]
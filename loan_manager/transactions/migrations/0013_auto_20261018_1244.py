@@ -0,0 +1,35 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+# The paid and overdue loans, as compute_status of the model decides
+SET_LOAN_STATUS = '''
+UPDATE transactions_loan
+   SET status = CASE WHEN outstanding_balance <= 0 THEN 'paid' ELSE 'overdue' END
+ WHERE outstanding_balance <= 0 OR end_date < current_date;
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_auto_20261018_1236'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('overdue', 'Overdue'), ('paid', 'Paid')], default='open', max_length=10),
+        ),
+        migrations.RunSQL(SET_LOAN_STATUS,
+                          migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['end_date', 'id'], name='loan_open_end_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('status', 'overdue')), fields=['request_date', 'id'], name='loan_overdue_request_date_idx'),
+        ),
+    ]
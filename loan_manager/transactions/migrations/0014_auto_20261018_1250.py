@@ -0,0 +1,39 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:50
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Matches the UPPER(client::text) LIKE of the icontains and istartswith
+# lookups. Written in SQL, as OpClass can't index expressions in Django 3.2.
+CREATE_CLIENT_TRGM_INDEX = '''
+CREATE INDEX loan_client_trgm_idx
+    ON transactions_loan USING gin (UPPER(client) gin_trgm_ops);
+'''
+
+DROP_CLIENT_TRGM_INDEX = 'DROP INDEX loan_client_trgm_idx;'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0013_auto_20261018_1244'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['bank', 'request_date', 'id'], name='loan_bank_request_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['end_date', 'id'], name='loan_end_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['outstanding_balance', 'id'], name='loan_outstanding_id_idx'),
+        ),
+        migrations.RunSQL(CREATE_CLIENT_TRGM_INDEX,
+                          DROP_CLIENT_TRGM_INDEX),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.18 on 2026-10-18 13:40
+
+from django.db import migrations
+
+
+PORTFOLIO_SUMMARY = '''
+DROP MATERIALIZED VIEW transactions_portfolio_summary;
+
+CREATE MATERIALIZED VIEW transactions_portfolio_summary AS
+SELECT row_number() OVER (ORDER BY bank, client, interest_type, request_month) AS id,
+       summary.*,
+       now() AS refreshed_at
+  FROM (SELECT bank,
+               client,
+               interest_type,
+               date_trunc('month', request_date)::date AS request_month,
+               count(*) AS loans_count,
+               sum(nominal_value) AS nominal_value,
+               sum(full_debt) AS full_debt,
+               sum(total_paid) AS total_paid,
+               sum(outstanding_balance) AS outstanding_balance,
+               count(*) FILTER (WHERE {overdue}) AS overdue_count
+          FROM transactions_loan
+         GROUP BY bank, client, interest_type, request_month) AS summary;
+
+CREATE UNIQUE INDEX transactions_portfolio_summary_key
+    ON transactions_portfolio_summary (bank, client, interest_type, request_month);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0014_auto_20261018_1250'),
+    ]
+
+    operations = [
+        # Count the stored status kept by scan_delinquency, rather than
+        # repeating its due date rule
+        migrations.RunSQL(
+            PORTFOLIO_SUMMARY.format(overdue="status = 'overdue'"),
+            PORTFOLIO_SUMMARY.format(overdue='end_date < current_date AND outstanding_balance > 0'),
+        ),
+    ]
@@ -1,9 +1,95 @@
 # Libs imports
 import datetime
+from decimal import Decimal
 
 # Django imports
-from django.db import models
-from django.db.models import Sum
+from django.db import connection, models, transaction
+from django.db.models import (Case, ExpressionWrapper, F, Func, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Power
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Project imports
+from loan_manager.response_cache import bump_data_version
+
+# Transactions app imports
+from transactions import events
+
+
+# Longest window of LoanQuerySet.maturing, a hundred years. Windows that end
+# past the last date Python handles would overflow.
+MAX_MATURING_DAYS = 36500
+
+
+class RoundHalfEven(Func):
+    """Round to cents with the half-even rule used by Python's round()."""
+    template = ('CASE WHEN MOD(ABS(%(expression)s) * 100, 2) = 0.5 '
+                'THEN TRUNC(%(expression)s, 2) '
+                'ELSE ROUND(%(expression)s, 2) END')
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return self.template % {'expression': sql}, params * 3
+
+
+class LoanQuerySet(models.QuerySet):
+    def overdue(self):
+        return self.filter(status=Loan.Status.OVERDUE)
+
+    def maturing(self, days, today=None):
+        """Open loans whose end date is within ``days`` days from today."""
+        today = today or datetime.date.today()
+        return self.filter(status=Loan.Status.OPEN,
+                           end_date__gte=today,
+                           end_date__lte=today + datetime.timedelta(days=days))
+
+    def with_financials(self):
+        """Annotate the loan financials computed by the database.
+
+        The annotations mirror the ``get_*`` properties of ``Loan`` and are
+        prefixed with ``computed_``, since the balances also exist as stored
+        columns.
+        """
+        money = models.DecimalField(max_digits=20, decimal_places=2)
+        rate = models.DecimalField(max_digits=30, decimal_places=20)
+
+        payments = (Payment.objects.filter(loan=OuterRef('pk'))
+                                   .values('loan')
+                                   .annotate(total=Sum('value'))
+                                   .values('total'))
+        months_difference = ((ExtractYear('end_date') - ExtractYear('request_date'))
+                             * 12
+                             + (ExtractMonth('end_date') - ExtractMonth('request_date')))
+        interest_rate = ExpressionWrapper(F('interest_rate') / Value(Decimal(100)),
+                                          output_field=rate)
+        interest_value = Case(
+            When(interest_type=Loan.InterestType.SIMPLE,
+                 then=F('nominal_value') * interest_rate),
+            default=(F('nominal_value')
+                     * Power(Value(Decimal(1)) + interest_rate,
+                             F('computed_months_difference'))
+                     - F('nominal_value')),
+            output_field=rate
+        )
+
+        return self.annotate(
+            computed_total_paid=Coalesce(Subquery(payments),
+                                         Value(Decimal(0)),
+                                         output_field=money),
+            computed_months_difference=months_difference,
+            computed_interest_value=RoundHalfEven(interest_value,
+                                                  output_field=money),
+            computed_full_debt=ExpressionWrapper(
+                F('nominal_value') + F('computed_interest_value'),
+                output_field=money
+            ),
+            computed_outstanding_balance=ExpressionWrapper(
+                F('computed_full_debt') - F('computed_total_paid'),
+                output_field=money
+            )
+        )
 
 
 class Loan(models.Model):
@@ -11,8 +97,15 @@ class Loan(models.Model):
         SIMPLE = 1
         COMPOUND = 2
 
+    class Status(models.TextChoices):
+        OPEN = 'open'
+        OVERDUE = 'overdue'
+        PAID = 'paid'
+
+    # Indexed by the composite indexes below, which lead with the account
     user_account = models.ForeignKey('account.Account',
-                                on_delete=models.CASCADE)
+                                     on_delete=models.CASCADE,
+                                     db_index=False)
     nominal_value = models.DecimalField(max_digits=14,
                                         decimal_places=2)
     interest_rate = models.DecimalField(max_digits=5,
@@ -25,9 +118,90 @@ class Loan(models.Model):
     interest_type = models.IntegerField(choices=InterestType.choices,
                                         default=InterestType.SIMPLE)
 
+    # Denormalized balances, kept current by the payment writes
+    total_paid = models.DecimalField(max_digits=20,
+                                     decimal_places=2,
+                                     default=0)
+    full_debt = models.DecimalField(max_digits=20,
+                                    decimal_places=2,
+                                    default=0)
+    outstanding_balance = models.DecimalField(max_digits=20,
+                                              decimal_places=2,
+                                              default=0)
+    # Kept current by the balance writes and, as the end dates pass, by the
+    # scan_delinquency command
+    status = models.CharField(max_length=10,
+                              choices=Status.choices,
+                              default=Status.OPEN)
+
+    # Bumped by every change of the loan or of its payments, for the ETags
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = LoanQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['request_date', 'id'],
+                         name='loan_request_date_id_idx'),
+            models.Index(fields=['user_account', 'request_date', 'id'],
+                         name='loan_user_request_date_id_idx'),
+            # Filters and orderings of the loan listings
+            models.Index(fields=['bank', 'request_date', 'id'],
+                         name='loan_bank_request_date_id_idx'),
+            models.Index(fields=['end_date', 'id'],
+                         name='loan_end_date_id_idx'),
+            models.Index(fields=['outstanding_balance', 'id'],
+                         name='loan_outstanding_id_idx'),
+            # The client search reads loan_client_trgm_idx, a trigram index
+            # of UPPER(client) created by migration 0014
+            # Read by the delinquency scan and the maturing_in filter
+            models.Index(fields=['end_date', 'id'],
+                         condition=Q(status='open'),
+                         name='loan_open_end_date_id_idx'),
+            models.Index(fields=['request_date', 'id'],
+                         condition=Q(status='overdue'),
+                         name='loan_overdue_request_date_idx'),
+        ]
+
     def __str__(self):
         return f'Loan from {self.bank} to {self.client} on value of {self.nominal_value}'
 
+    def save(self, *args, **kwargs):
+        if self.request_date is None:
+            # auto_now_add is only applied by the field on insert
+            self.request_date = datetime.date.today()
+        if not self._state.adding:
+            self.version += 1
+        self.compute_balances()
+        super().save(*args, **kwargs)
+
+    def compute_balances(self):
+        """Recompute the stored full debt, outstanding balance and status."""
+        self.full_debt = self.get_full_debt
+        self.outstanding_balance = self.full_debt - self.total_paid
+        self.status = self.compute_status(self.outstanding_balance, self.end_date)
+
+    def register_payment(self, value):
+        """Add a paid value (negative to revert it) to the stored balances."""
+        now = timezone.now()
+        Loan.objects.filter(pk=self.pk).update(
+            total_paid=F('total_paid') + value,
+            outstanding_balance=F('outstanding_balance') - value,
+            status=Case(
+                When(outstanding_balance__lte=value, then=Value(Loan.Status.PAID)),
+                When(end_date__lt=datetime.date.today(), then=Value(Loan.Status.OVERDUE)),
+                default=Value(Loan.Status.OPEN)
+            ),
+            version=F('version') + 1,
+            updated_at=now
+        )
+        self.total_paid += value
+        self.outstanding_balance -= value
+        self.status = self.compute_status(self.outstanding_balance, self.end_date)
+        self.version += 1
+        self.updated_at = now
+
     @property
     def get_months_difference(self):
         request_date = self.request_date
@@ -39,16 +213,32 @@ class Loan(models.Model):
 
     @property
     def get_interest_value(self):
-        interest_rate = self.interest_rate/100
-        if self.interest_type == self.InterestType.SIMPLE:
-            interest_value = self.nominal_value * interest_rate
+        return self.compute_interest_value(self.nominal_value,
+                                           self.interest_rate,
+                                           self.interest_type,
+                                           self.get_months_difference)
+
+    @classmethod
+    def compute_interest_value(cls, nominal_value, interest_rate, interest_type,
+                               months_difference):
+        """Interest of a loan, for callers that have no Loan instance."""
+        interest_rate = interest_rate/100
+        if interest_type == cls.InterestType.SIMPLE:
+            interest_value = nominal_value * interest_rate
         else:
-            months_difference = self.get_months_difference
-            interest_value = (self.nominal_value
+            interest_value = (nominal_value
                               * (1 + interest_rate)**months_difference)
-            interest_value -= self.nominal_value
+            interest_value -= nominal_value
         return round(interest_value, 2)
 
+    @classmethod
+    def compute_status(cls, outstanding_balance, end_date, today=None):
+        if outstanding_balance <= 0:
+            return cls.Status.PAID
+        if end_date < (today or datetime.date.today()):
+            return cls.Status.OVERDUE
+        return cls.Status.OPEN
+
     @property
     def get_full_debt(self):
         return self.nominal_value + self.get_interest_value
@@ -65,11 +255,127 @@ class Loan(models.Model):
 
 
 class Payment(models.Model):
+    # Indexed by payment_loan_date_id_idx, which leads with the loan
     loan = models.ForeignKey(Loan,
-                             on_delete=models.CASCADE)
+                             on_delete=models.CASCADE,
+                             db_index=False)
     date = models.DateField()
     value = models.DecimalField(max_digits=14,
                                 decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'],
+                         name='payment_date_id_idx'),
+            # Covers the per loan listings and the sums of the paid values
+            models.Index(fields=['loan', 'date', 'id'],
+                         include=['value'],
+                         name='payment_loan_date_value_idx'),
+        ]
 
     def __str__(self):
         return f'Payment from {self.loan.client} to {self.loan.bank} on value of {self.value}'
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Payment.objects.filter(pk=self.pk).values('loan_id', 'value').first()
+            # Read by the post_save receiver to also notify the previous loan
+            self._previous_loan_id = previous and previous['loan_id']
+            super().save(*args, **kwargs)
+
+            value = self.value
+            if previous:
+                if previous['loan_id'] == self.loan_id:
+                    value -= previous['value']
+                else:
+                    Loan(pk=previous['loan_id']).register_payment(-previous['value'])
+            self.loan.register_payment(value)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            self.loan.register_payment(-self.value)
+        return deleted
+
+
+class PortfolioSummary(models.Model):
+    """Loan totals per bank, client, interest type and request month.
+
+    Backed by a Postgres materialized view over the stored loan balances,
+    rebuilt by ``refresh()`` (see the refresh_portfolio_summary command).
+    """
+    bank = models.CharField(max_length=100)
+    client = models.CharField(max_length=100)
+    interest_type = models.IntegerField(choices=Loan.InterestType.choices)
+    request_month = models.DateField()
+    loans_count = models.IntegerField()
+    nominal_value = models.DecimalField(max_digits=20,
+                                        decimal_places=2)
+    full_debt = models.DecimalField(max_digits=20,
+                                    decimal_places=2)
+    total_paid = models.DecimalField(max_digits=20,
+                                     decimal_places=2)
+    outstanding_balance = models.DecimalField(max_digits=20,
+                                              decimal_places=2)
+    overdue_count = models.IntegerField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'transactions_portfolio_summary'
+
+    @classmethod
+    def refresh(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}')
+
+
+class LoanImport(models.Model):
+    """Progress of a loan import, used to resume it after a failure."""
+    source = models.CharField(max_length=255, unique=True)
+    position = models.BigIntegerField(default=0)
+    imported = models.BigIntegerField(default=0)
+    rejected = models.BigIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Import of {self.source} at row {self.position}'
+
+    def reset(self):
+        self.position = 0
+        self.imported = 0
+        self.rejected = 0
+        self.finished = False
+        self.save()
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def loan_changed(sender, instance=None, **kwargs):
+    bump_data_version('transactions', instance.user_account_id)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance=None, **kwargs):
+    bump_data_version('transactions', instance.loan.user_account_id)
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance=None, created=False, **kwargs):
+    previous_loan_id = getattr(instance, '_previous_loan_id', None)
+    if previous_loan_id and previous_loan_id != instance.loan_id:
+        # Moved to another loan, which is a removal from the previous one
+        events.publish_payment_event(events.PAYMENT_DELETED, instance, loan_id=previous_loan_id)
+        created = True
+    events.publish_payment_event(events.PAYMENT_CREATED if created else events.PAYMENT_UPDATED,
+                                 instance)
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance=None, **kwargs):
+    events.publish_payment_event(events.PAYMENT_DELETED, instance)
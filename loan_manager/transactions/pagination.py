@@ -0,0 +1,132 @@
+# Libs imports
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+# Django imports
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination filtering on the position of the last row seen.
+
+    ``ordering`` must end with a unique field, so that every row has a
+    distinct position. Unlike OFFSET based paging, deep pages are read
+    straight from the matching composite index.
+    """
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        position, self.reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+
+        ordering = self.get_ordering()
+        if self.has_cursor:
+            queryset = queryset.filter(self.get_position_filter(ordering, position))
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.PAGE_SIZE
+        return min(max(page_size, 1), settings.MAX_PAGE_SIZE)
+
+    def get_ordering(self):
+        if not self.reverse:
+            return self.ordering
+        return tuple(name[1:] if name.startswith('-') else f'-{name}'
+                     for name in self.ordering)
+
+    def get_position_filter(self, ordering, position):
+        """Rows strictly after ``position`` in the given ordering.
+
+        The leading ``lte``/``gte`` bound repeats the first term, so the
+        database can start the index range scan at the cursor.
+        """
+        names = [name.lstrip('-') for name in ordering]
+        lookups = ['lt' if name.startswith('-') else 'gt' for name in ordering]
+
+        condition = Q()
+        for index, name in enumerate(names):
+            term = Q(**{f'{name}__{lookups[index]}': position[index]})
+            for previous in range(index):
+                term &= Q(**{names[previous]: position[previous]})
+            condition |= term
+        bound = 'lte' if lookups[0] == 'lt' else 'gte'
+        return Q(**{f'{names[0]}__{bound}': position[0]}) & condition
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.page[-1], reverse=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            return None
+        if (self.reverse and self.has_more) or (not self.reverse and self.has_cursor):
+            return self.encode_cursor(self.page[0], reverse=True)
+        return None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            fields = [self.model._meta.get_field(name.lstrip('-'))
+                      for name in self.ordering]
+            position = [field.to_python(value)
+                        for field, value in zip(fields, cursor['position'])]
+            if len(position) != len(fields):
+                raise ValueError
+            return position, bool(cursor['reverse'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        # Pages are model instances or .values() rows
+        if isinstance(obj, dict):
+            position = [str(obj[name.lstrip('-')]) for name in self.ordering]
+        else:
+            position = [str(getattr(obj, name.lstrip('-'))) for name in self.ordering]
+        cursor = json.dumps({'position': position, 'reverse': reverse})
+        encoded = urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(),
+                                   self.cursor_query_param,
+                                   encoded)
+
+
+class LoanPagination(KeysetPagination):
+    ordering = ('-request_date', '-id')
+
+
+class PaymentPagination(KeysetPagination):
+    ordering = ('-date', '-id')
@@ -0,0 +1,9 @@
+# Django imports
+from django.urls import path
+
+# Transactions app imports
+from transactions.consumers import LoanBalanceConsumer
+
+websocket_urlpatterns = [
+    path('ws/loans/', LoanBalanceConsumer.as_asgi()),
+]
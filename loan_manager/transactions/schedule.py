@@ -0,0 +1,179 @@
+# Libs imports
+import calendar
+import datetime
+from decimal import Decimal
+
+import numpy as np
+
+# Django imports
+from django.db.models import BigIntegerField, F, FloatField
+from django.db.models.functions import Cast, ExtractMonth, ExtractYear
+
+# Transactions app imports
+from transactions.models import Loan, Payment
+
+
+def months_difference(start, end):
+    """Months between two date expressions, like Loan.get_months_difference."""
+    return ((ExtractYear(end) - ExtractYear(start))
+            * 12
+            + (ExtractMonth(end) - ExtractMonth(start)))
+
+
+def cents(expression):
+    return Cast(F(expression) * 100, BigIntegerField())
+
+
+def compute_schedules(interest_type, interest_rate, months, interest_value, full_debt,
+                      payment_loan=(), payment_month=(), payment_value=()):
+    """Amortization schedules of many loans in one vectorized pass.
+
+    The loan arguments are arrays with one entry per loan and the money is
+    in integer cents. Payments are parallel arrays with the index of their
+    loan, their month offset from the request date and their value.
+
+    The debt is split in equal installments, one per month. The interest of
+    simple loans accrues linearly and the interest of compound loans accrues
+    on the monthly compounded nominal value. Cumulative amounts are rounded
+    half-even to whole cents and the monthly amounts are their differences,
+    so every schedule adds up exactly to the loan's interest and full debt.
+
+    Returns a dict of flat arrays with one entry per installment, ordered by
+    loan and month.
+    """
+    interest_type = np.asarray(interest_type)
+    rate = np.asarray(interest_rate, dtype=np.float64) / 100
+    interest_value = np.asarray(interest_value, dtype=np.int64)
+    full_debt = np.asarray(full_debt, dtype=np.int64)
+    periods = np.maximum(np.asarray(months, dtype=np.int64), 1)
+
+    starts = np.concatenate(([0], np.cumsum(periods)[:-1])).astype(np.int64)
+    loan = np.repeat(np.arange(len(periods)), periods)
+    month = np.arange(len(loan)) - starts[loan] + 1
+
+    row_periods = periods[loan]
+    row_rate = rate[loan]
+    linear = month / row_periods
+    compound = ((interest_type[loan] == Loan.InterestType.COMPOUND)
+                & (row_rate != 0) & (row_rate > -1))
+    growth = np.log1p(np.where(compound, row_rate, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        accrued = np.where(compound,
+                           np.expm1(month * growth) / np.expm1(row_periods * growth),
+                           linear)
+
+    cumulative_interest = np.rint(accrued * interest_value[loan]).astype(np.int64)
+    cumulative_installment = np.rint(linear * full_debt[loan]).astype(np.int64)
+
+    paid = np.zeros(len(loan), dtype=np.int64)
+    payment_loan = np.asarray(payment_loan, dtype=np.int64)
+    if len(payment_loan):
+        payment_row = (starts[payment_loan]
+                       + np.clip(np.asarray(payment_month, dtype=np.int64),
+                                 1, periods[payment_loan])
+                       - 1)
+        np.add.at(paid, payment_row, np.asarray(payment_value, dtype=np.int64))
+    cumulative_paid = _cumulative(paid, starts, loan)
+
+    interest = _per_period(cumulative_interest, starts)
+    installment = _per_period(cumulative_installment, starts)
+    return {
+        'loan': loan,
+        'month': month,
+        'interest': interest,
+        'installment': installment,
+        'principal': installment - interest,
+        'paid': paid,
+        'expected_balance': full_debt[loan] - cumulative_installment,
+        'balance': full_debt[loan] - cumulative_paid,
+    }
+
+
+def _per_period(cumulative, starts):
+    values = np.diff(cumulative, prepend=0)
+    values[starts] = cumulative[starts]
+    return values
+
+
+def _cumulative(values, starts, loan):
+    total = np.cumsum(values)
+    return total - (total[starts] - values[starts])[loan]
+
+
+def load_schedules(loans):
+    """Schedules of a queryset of loans, reading the database twice.
+
+    Returns the ordered loan ids and the arrays of ``compute_schedules``.
+    """
+    rows = list(
+        loans.order_by('pk')
+             .values_list('pk',
+                          'interest_type',
+                          Cast('interest_rate', FloatField()),
+                          months_difference('request_date', 'end_date'),
+                          Cast((F('full_debt') - F('nominal_value')) * 100,
+                               BigIntegerField()),
+                          cents('full_debt'))
+    )
+    if not rows:
+        return np.array([], dtype=np.int64), compute_schedules([], [], [], [], [])
+    loan_ids, interest_type, rate, months, interest_value, full_debt = map(np.array,
+                                                                          zip(*rows))
+
+    payments = list(
+        Payment.objects.filter(loan__in=loans)
+                       .values_list('loan_id',
+                                    months_difference('loan__request_date', 'date'),
+                                    cents('value'))
+    )
+    payment_loan, payment_month, payment_value = (map(np.array, zip(*payments))
+                                                  if payments else ((), (), ()))
+    payment_loan = np.searchsorted(loan_ids, payment_loan)
+
+    return loan_ids, compute_schedules(interest_type, rate, months, interest_value,
+                                       full_debt, payment_loan, payment_month,
+                                       payment_value)
+
+
+def iter_schedules(loans, chunk_size=100000):
+    """Yield ``load_schedules`` results for a large queryset, chunk by chunk."""
+    last_pk = None
+    while True:
+        chunk = loans.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk_ids = list(chunk.values_list('pk', flat=True)[:chunk_size])
+        if not chunk_ids:
+            return
+        last_pk = chunk_ids[-1]
+        yield load_schedules(Loan.objects.filter(pk__in=chunk_ids))
+
+
+def add_months(date, months):
+    month = date.month - 1 + months
+    year = date.year + month // 12
+    month = month % 12 + 1
+    return datetime.date(year, month, min(date.day, calendar.monthrange(year, month)[1]))
+
+
+def loan_schedule(loan):
+    """Month by month schedule of a single loan, with Decimal amounts."""
+    _, schedule = load_schedules(Loan.objects.filter(pk=loan.pk))
+    installments = []
+    last = len(schedule['month']) - 1
+    for index, month in enumerate(schedule['month'].tolist()):
+        installments.append({
+            'month': month,
+            'due_date': loan.end_date if index == last else add_months(loan.request_date, month),
+            'interest': _decimal(schedule['interest'][index]),
+            'installment': _decimal(schedule['installment'][index]),
+            'principal': _decimal(schedule['principal'][index]),
+            'paid': _decimal(schedule['paid'][index]),
+            'expected_balance': _decimal(schedule['expected_balance'][index]),
+            'balance': _decimal(schedule['balance'][index]),
+        })
+    return installments
+
+
+def _decimal(value):
+    return Decimal(int(value)).scaleb(-2)
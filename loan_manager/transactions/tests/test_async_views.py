@@ -0,0 +1,122 @@
+# Libs imports
+import asyncio
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+
+from asgiref.testing import ApplicationCommunicator
+
+# Django imports
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+# Apps imports
+from account.models import Account
+from loan_manager.asgi import application
+from loan_manager.perf import get_samples
+from transactions.models import Loan, Payment
+
+
+class TestAsyncViews(TransactionTestCase):
+    """Requests through the ASGI handler, whose views run on the thread pool.
+
+    The pool threads use their own connections, so the rows are committed
+    (TransactionTestCase) for them to see.
+    """
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        token, _ = Token.objects.get_or_create(user=self.account)
+        self.client = AsyncClient()
+        # The async client sends extra keyword arguments as headers
+        self.headers = {'authorization': f'Token {token.key}'}
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        )
+        self.payment = Payment.objects.create(
+            loan=self.loan,
+            value=2500,
+            date=datetime.date.today()
+        )
+
+    async def test_read_endpoints(self):
+        urls = [reverse('loans_list'),
+                reverse('loan_detail', args=[self.loan.pk]),
+                reverse('payments_per_loan', args=[self.loan.pk]),
+                reverse('payments_list')]
+        responses = await asyncio.gather(*[self.client.get(url, **self.headers) for url in urls])
+
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        loans, loan, loan_payments, payments = [json.loads(response.content)
+                                                for response in responses]
+        self.assertEqual([row['id'] for row in loans['results']], [self.loan.pk])
+        self.assertEqual(loan['total_paid'], 2500)
+        self.assertEqual([row['id'] for row in loan_payments['results']], [self.payment.pk])
+        self.assertEqual([row['id'] for row in payments['results']], [self.payment.pk])
+
+    async def test_write_endpoint(self):
+        response = await self.client.post(reverse('payments_list'), {
+            'loan': self.loan.pk,
+            'date': datetime.date.today().isoformat(),
+            'value': 500,
+        }, content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                       PERF_INSTRUMENTATION=True)
+    async def test_queries_are_recorded(self):
+        cache.clear()
+        await self.client.get(reverse('loans_list'), **self.headers)
+        samples = get_samples('loans_list')
+        self.assertEqual(len(samples), 1)
+        # Token lookup and the page of loans
+        self.assertEqual(samples[0][0], 2)
+
+    async def test_export_streams_through_asgi(self):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': reverse('loans_export'),
+            'raw_path': reverse('loans_export').encode(),
+            'query_string': b'format=csv',
+            'root_path': '',
+            'headers': [(b'host', b'testserver'),
+                        (b'authorization', self.headers['authorization'].encode())],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+
+        body = b''
+        while True:
+            message = await communicator.receive_output(timeout=5)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual([int(row['id']) for row in rows], [self.loan.pk])
+        self.assertEqual(Decimal(rows[0]['total_paid']), 2500)
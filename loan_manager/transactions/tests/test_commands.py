@@ -0,0 +1,186 @@
+# Libs imports
+import csv
+import datetime
+import os
+import tempfile
+from io import StringIO
+
+# Django imports
+from django.conf import settings
+from django.core.management import call_command, get_commands
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, LoanImport, Payment
+
+
+class TestTransactionsCommands(TestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=2
+        )
+        Payment.objects.create(
+            loan=self.loan,
+            value=2500,
+            date=datetime.date.today()
+        )
+
+    def test_reconcile_loan_balances_check(self):
+        call_command('reconcile_loan_balances', '--check', stdout=StringIO())
+
+    def test_reconcile_loan_balances_rebuild(self):
+        Loan.objects.filter(pk=self.loan.pk).update(total_paid=0,
+                                                    outstanding_balance=0)
+        with self.assertRaises(CommandError):
+            call_command('reconcile_loan_balances', '--check', stdout=StringIO())
+
+        call_command('reconcile_loan_balances', stdout=StringIO())
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.total_paid, 2500)
+        self.assertEqual(loan.outstanding_balance, loan.get_outstanding_balance)
+        call_command('reconcile_loan_balances', '--check', stdout=StringIO())
+
+    def test_scan_delinquency(self):
+        today = datetime.date.today()
+        loans = []
+        for index in range(3):
+            loan = Loan.objects.create(
+                user_account=self.account,
+                nominal_value=1000,
+                interest_rate=1,
+                end_date=today + datetime.timedelta(days=10),
+                bank='BRB',
+                client='Jon'
+            )
+            loans.append(loan)
+        Payment.objects.create(loan=loans[2], value=1010, date=today)
+        self.assertEqual(Loan.objects.get(pk=loans[2].pk).status, Loan.Status.PAID)
+        # Their end dates pass
+        Loan.objects.filter(pk__in=[loan.pk for loan in loans]).update(
+            end_date=today - datetime.timedelta(days=1)
+        )
+
+        out = StringIO()
+        call_command('scan_delinquency', '--batch-size', '1', '--maturing-in', '400', stdout=out)
+        self.assertIn('2 loans marked as overdue', out.getvalue())
+        self.assertIn('1 open loans end in the next 400 days', out.getvalue())
+        statuses = {loan.pk: loan.status for loan in Loan.objects.all()}
+        self.assertEqual(statuses, {self.loan.pk: Loan.Status.OPEN,
+                                    loans[0].pk: Loan.Status.OVERDUE,
+                                    loans[1].pk: Loan.Status.OVERDUE,
+                                    loans[2].pk: Loan.Status.PAID})
+
+        out = StringIO()
+        call_command('scan_delinquency', stdout=out)
+        self.assertIn('0 loans marked as overdue', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('scan_delinquency', '--maturing-in', '99999999999', stdout=out)
+
+        # Paying off an overdue loan, or reverting the payment
+        payment = Payment.objects.create(loan=loans[0], value=1010, date=today)
+        self.assertEqual(Loan.objects.get(pk=loans[0].pk).status, Loan.Status.PAID)
+        payment.delete()
+        self.assertEqual(Loan.objects.get(pk=loans[0].pk).status, Loan.Status.OVERDUE)
+
+    def write_loans_csv(self, rows):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'loans.csv')
+        with open(path, 'w', newline='') as loans_file:
+            writer = csv.writer(loans_file)
+            writer.writerow(['user_account', 'nominal_value', 'interest_rate',
+                             'interest_type', 'request_date', 'end_date', 'bank', 'client'])
+            writer.writerows(rows)
+        return path
+
+    def test_import_loans(self):
+        path = self.write_loans_csv([
+            [self.account.pk, '1000.00', '2.5', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+            [self.account.pk, '-5', '2.5', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+            [self.account.pk, '1000', '1', 2, '2021-01-10', '2021-01-10', 'BRB', 'Jon'],
+            [self.account.pk, '2000', '1', 2, '2021-01-10', '2021-07-10', 'Inter', 'Jon'],
+        ])
+        call_command('import_loans', path, stdout=StringIO())
+
+        loans = Loan.objects.filter(request_date=datetime.date(2021, 1, 10)).order_by('pk')
+        self.assertEqual([loan.bank for loan in loans], ['BRB', 'Inter'])
+        for loan in loans:
+            self.assertEqual(loan.full_debt, loan.get_full_debt)
+            self.assertEqual(loan.outstanding_balance, loan.get_full_debt)
+            self.assertEqual(loan.status, Loan.Status.OVERDUE)
+
+        with open(f'{path}.rejected.csv', newline='') as rejected_file:
+            rejected = list(csv.DictReader(rejected_file))
+        self.assertEqual([row['line'] for row in rejected], ['2', '3'])
+        self.assertEqual(rejected[0]['error'],
+                         'nominal_value: The value needs to be greater than zero.')
+
+        checkpoint = LoanImport.objects.get()
+        self.assertEqual((checkpoint.position, checkpoint.imported, checkpoint.rejected),
+                         (4, 2, 2))
+        self.assertTrue(checkpoint.finished)
+
+    def test_import_loans_rejects_null_characters(self):
+        path = self.write_loans_csv([
+            [self.account.pk, '1000', '2', 1, '2021-01-10', '2022-01-10', 'BRB\x00', 'Jon'],
+            [self.account.pk, '2000', '2', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon\x00'],
+            [self.account.pk, '3000', '2', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+        ])
+        call_command('import_loans', path, stdout=StringIO())
+
+        imported = Loan.objects.filter(request_date=datetime.date(2021, 1, 10))
+        self.assertEqual([loan.nominal_value for loan in imported], [3000])
+        with open(f'{path}.rejected.csv', newline='') as rejected_file:
+            rejected = list(csv.DictReader(rejected_file))
+        self.assertEqual([(row['line'], row['error']) for row in rejected],
+                         [('1', 'bank: Null characters are not allowed.'),
+                          ('2', 'client: Null characters are not allowed.')])
+        self.assertTrue(LoanImport.objects.get().finished)
+
+    def test_import_loans_resume(self):
+        path = self.write_loans_csv([
+            [self.account.pk, '1000', '2', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+            [self.account.pk, '2000', '2', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+            [self.account.pk, '3000', '2', 1, '2021-01-10', '2022-01-10', 'BRB', 'Jon'],
+        ])
+        # An earlier run committed the first batch and stopped
+        LoanImport.objects.create(source=os.path.realpath(path), position=2, imported=2)
+        call_command('import_loans', path, '--batch-size', '2', stdout=StringIO())
+
+        imported = Loan.objects.filter(request_date=datetime.date(2021, 1, 10))
+        self.assertEqual([loan.nominal_value for loan in imported], [3000])
+        self.assertEqual(LoanImport.objects.get().imported, 3)
+
+        call_command('import_loans', path, stdout=StringIO())
+        self.assertEqual(imported.count(), 1)
+
+    def test_crontab(self):
+        with open(os.path.join(settings.BASE_DIR, 'crontab')) as crontab:
+            entries = [line.split() for line in crontab
+                       if line.strip() and not line.startswith('#')]
+        commands = get_commands()
+        scheduled = []
+        for entry in entries:
+            # Five schedule fields, then the command run from the project
+            self.assertEqual(entry[5:9], ['cd', '/usr/app', '&&', '/usr/local/bin/python'])
+            self.assertEqual(entry[9], 'manage.py')
+            self.assertIn(entry[10], commands)
+            scheduled.append(entry[10])
+        self.assertEqual(scheduled, ['scan_delinquency', 'refresh_portfolio_summary'])
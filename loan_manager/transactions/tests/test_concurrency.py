@@ -0,0 +1,62 @@
+# Libs imports
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Django imports
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, Payment
+
+
+class TestConcurrentPayments(TransactionTestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        )
+
+    def post_payment(self, value):
+        client = APIClient()
+        client.force_authenticate(self.account)
+        try:
+            response = client.post(reverse('payments_list'), {
+                'loan': self.loan.pk,
+                'date': datetime.date.today(),
+                'value': value,
+            })
+            return response.status_code
+        finally:
+            connection.close()
+
+    def test_parallel_payments_never_overpay_loan(self):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            codes = list(executor.map(self.post_payment, [1000] * 200))
+
+        loan = Loan.objects.get(pk=self.loan.pk)
+        created = codes.count(status.HTTP_201_CREATED)
+        self.assertEqual(created, 21)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), 200 - created)
+        self.assertEqual(Payment.objects.filter(loan=loan).count(), created)
+        self.assertEqual(loan.total_paid, loan.get_total_paid)
+        self.assertLessEqual(loan.total_paid, loan.full_debt)
+        self.assertEqual(loan.outstanding_balance, loan.get_outstanding_balance)
@@ -0,0 +1,193 @@
+# Libs imports
+import datetime
+
+from channels.db import database_sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+
+# Django imports
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Apps imports
+from account.models import Account
+from loan_manager.asgi import application
+from transactions.bulk import create_payments
+from transactions.models import Loan, Payment
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class TestLoanBalanceConsumer(TransactionTestCase):
+    """The events are sent after the commit, so the rows are committed."""
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        self.token, _ = Token.objects.get_or_create(user=self.account)
+        self.other_account = Account.objects.create(
+            username='ana',
+            email='ana@mail.com',
+            password='password123'
+        )
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.loan, self.second_loan, self.other_loan = [Loan.objects.create(
+            user_account=account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        ) for account in [self.account, self.account, self.other_account]]
+
+    async def connect(self, path=None):
+        communicator = WebsocketCommunicator(application,
+                                             path or f'/ws/loans/?token={self.token.key}')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_rejects_anonymous_connections(self):
+        for path in ['/ws/loans/', '/ws/loans/?token=invalid']:
+            communicator = WebsocketCommunicator(application, path)
+            connected, code = await communicator.connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+
+    async def test_authenticates_with_the_header(self):
+        communicator = WebsocketCommunicator(
+            application, '/ws/loans/',
+            headers=[(b'authorization', f'Token {self.token.key}'.encode())]
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
+    async def test_payment_events(self):
+        await database_sync_to_async(self.loan.refresh_from_db)()
+        communicator = await self.connect()
+        await communicator.send_json_to({'action': 'subscribe', 'loans': [self.loan.pk]})
+        subscribed = await communicator.receive_json_from()
+        self.assertEqual(subscribed, {'event': 'subscribed', 'loans': [{
+            'loan': self.loan.pk,
+            'total_paid': '0.00',
+            'outstanding_balance': str(self.loan.outstanding_balance),
+        }]})
+
+        payment = await database_sync_to_async(Payment.objects.create)(
+            loan=self.loan, value=2500, date=datetime.date.today()
+        )
+        event = await communicator.receive_json_from()
+        await database_sync_to_async(self.loan.refresh_from_db)()
+        self.assertEqual(event['event'], 'payment_created')
+        self.assertEqual(event['loan'], self.loan.pk)
+        self.assertEqual(event['payment']['id'], payment.pk)
+        self.assertEqual(event['payment']['value'], '2500')
+        self.assertEqual(event['total_paid'], '2500.00')
+        self.assertEqual(event['outstanding_balance'], str(self.loan.outstanding_balance))
+
+        payment.value = 1000
+        await database_sync_to_async(payment.save)()
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['event'], 'payment_updated')
+        self.assertEqual(event['total_paid'], '1000.00')
+
+        await database_sync_to_async(payment.delete)()
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['event'], 'payment_deleted')
+        self.assertEqual(event['total_paid'], '0.00')
+
+        # Payments of loans not subscribed or of other users aren't sent
+        for loan in [self.second_loan, self.other_loan]:
+            await database_sync_to_async(Payment.objects.create)(
+                loan=loan, value=100, date=datetime.date.today()
+            )
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_subscribe_to_all_loans(self):
+        communicator = await self.connect()
+        await communicator.send_json_to({'action': 'subscribe',
+                                         'loans': [self.other_loan.pk]})
+        subscribed = await communicator.receive_json_from()
+        self.assertEqual(subscribed['loans'], [])
+
+        await communicator.send_json_to({'action': 'subscribe'})
+        subscribed = await communicator.receive_json_from()
+        self.assertEqual([row['loan'] for row in subscribed['loans']],
+                         [self.loan.pk, self.second_loan.pk])
+
+        results = await database_sync_to_async(create_payments)([
+            {'loan': self.loan.pk, 'date': datetime.date.today().isoformat(), 'value': 100},
+            {'loan': self.loan.pk, 'date': datetime.date.today().isoformat(), 'value': 200},
+            {'loan': self.second_loan.pk, 'date': datetime.date.today().isoformat(), 'value': 50},
+        ], self.account)
+        # One event per loan, from a single message to the user
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['event'], 'payments_created')
+        self.assertEqual(event['loan'], self.loan.pk)
+        self.assertEqual(event['payments'], [result['id'] for result in results[:2]])
+        self.assertEqual(event['total_paid'], '300.00')
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['loan'], self.second_loan.pk)
+        self.assertEqual(event['payments'], [results[2]['id']])
+        self.assertEqual(event['total_paid'], '50.00')
+
+        await communicator.send_json_to({'action': 'unsubscribe'})
+        self.assertEqual(await communicator.receive_json_from(),
+                         {'event': 'unsubscribed', 'loans': []})
+        await database_sync_to_async(Payment.objects.create)(
+            loan=self.loan, value=100, date=datetime.date.today()
+        )
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+
+class FailingChannelLayer(InMemoryChannelLayer):
+    """A channel layer whose server is down."""
+
+    async def group_send(self, group, message):
+        raise ConnectionError('Channel layer unavailable.')
+
+
+@override_settings(CHANNEL_LAYERS={'default': {
+    'BACKEND': 'transactions.tests.test_consumers.FailingChannelLayer'
+}})
+class TestChannelLayerDown(TransactionTestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.account)
+        year = datetime.date.today().year
+        self.loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, 1, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        )
+
+    def test_writes_succeed(self):
+        payment = {'loan': self.loan.pk, 'date': datetime.date.today().isoformat(), 'value': 100}
+        with self.assertLogs('transactions.events', 'ERROR') as logs:
+            response = self.client.post(reverse('payments_list'), payment, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = self.client.post(reverse('payments_bulk'), [payment, payment], format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).total_paid, 300)
@@ -0,0 +1,116 @@
+# Libs imports
+import threading
+from unittest import skipUnless
+
+import psycopg2
+
+# Django imports
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Apps imports
+from account.models import Account
+from loan_manager.db_pool.pool import ConnectionPool
+
+
+class TestConnectionPool(TestCase):
+    """Pools of their own, with connections outside the test transaction."""
+
+    def setUp(self):
+        params = connection.get_connection_params()
+        self.connect = lambda: psycopg2.connect(**params)
+
+    def make_pool(self, **options):
+        pool = ConnectionPool('test', **options)
+        self.addCleanup(pool.close_idle)
+        return pool
+
+    def test_reuses_connections(self):
+        pool = self.make_pool()
+        first = pool.getconn(self.connect)
+        pool.putconn(first)
+        self.assertIs(pool.getconn(self.connect), first)
+
+        second = pool.getconn(self.connect)
+        self.assertIsNot(second, first)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['in_use'], stats['created']), (2, 2, 2))
+        pool.putconn(first)
+        pool.putconn(second)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+    def test_waits_for_a_free_connection(self):
+        pool = self.make_pool(max_size=1, timeout=0.1)
+        first = pool.getconn(self.connect)
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn(self.connect)
+
+        pool.timeout = 5
+        threading.Timer(0.1, pool.putconn, [first]).start()
+        self.assertIs(pool.getconn(self.connect), first)
+        stats = pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts']), (1, 1))
+        pool.putconn(first)
+
+    def test_replaces_broken_connections(self):
+        pool = self.make_pool(check_after=0)
+        first = pool.getconn(self.connect)
+        pool.putconn(first)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [first.get_backend_pid()])
+
+        second = pool.getconn(self.connect)
+        self.assertIsNot(second, first)
+        stats = pool.stats()
+        self.assertEqual((stats['broken'], stats['health_checks'], stats['size']), (1, 1, 1))
+        pool.putconn(second)
+
+    def test_rolls_back_returned_connections(self):
+        pool = self.make_pool()
+        first = pool.getconn(self.connect)
+        with first.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertNotEqual(first.info.transaction_status,
+                            psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+        pool.putconn(first)
+        self.assertEqual(first.info.transaction_status,
+                         psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_recycles_old_connections(self):
+        pool = self.make_pool(max_lifetime=0)
+        first = pool.getconn(self.connect)
+        pool.putconn(first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+
+@skipUnless(settings.DB_POOL_MAX_SIZE, 'The connection pool is disabled.')
+class TestDatabasePoolStats(APITestCase):
+
+    def test_stats(self):
+        admin = Account.objects.create_superuser(
+            username='admin',
+            email='admin@mail.com',
+            password='password123'
+        )
+        account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+
+        self.client.force_authenticate(account)
+        response = self.client.get(reverse('db_pool_stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('db_pool_stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name = '{NAME}@{HOST}'.format(**connection.settings_dict)
+        stats = response.data['pools'][name]
+        self.assertGreaterEqual(stats['in_use'], 1)
+        self.assertIn('p95', stats['checkout_ms'])
@@ -0,0 +1,71 @@
+# Libs imports
+import datetime
+import io
+import random
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+# Django imports
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+# Apps imports
+from transactions.api.parsers import ORJSONParser
+from transactions.api.renderers import ORJSONRenderer
+
+
+class TestORJSON(SimpleTestCase):
+
+    def assertSameJSON(self, data, accepted_media_type=None):
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type),
+                         JSONRenderer().render(data, accepted_media_type))
+
+    def test_renders_like_json_renderer(self):
+        rng = random.Random(0)
+        rows = [OrderedDict([
+            ('id', index),
+            ('nominal_value', str(Decimal(rng.randint(1, 10**14)).scaleb(-2))),
+            ('full_debt', Decimal(rng.randint(0, 10**rng.randint(1, 15))).scaleb(-2)),
+            ('request_date', datetime.date(2021, 1, 1) + datetime.timedelta(days=index)),
+            ('ip_address', None if index % 2 else '::1'),
+        ]) for index in range(1000)]
+        self.assertSameJSON(OrderedDict([('next', None), ('results', rows)]))
+
+        self.assertSameJSON({
+            'aware': timezone.now(),
+            'naive': datetime.datetime(2021, 1, 2, 3, 4, 5, 678901),
+            'time': datetime.time(12, 30),
+            'duration': datetime.timedelta(days=1, seconds=5),
+            'uuid': uuid.uuid4(),
+            'text': 'Itaú "quoted" \\     \n',
+            'numbers': [0, -1, 1.5, True, False, Decimal('0'), Decimal('-0.01')],
+            1: 'integer key',
+        })
+
+    def test_falls_back_to_json_renderer(self):
+        # Written with other exponents by orjson or not supported by it
+        self.assertSameJSON({'full_debt': Decimal('12345678901234567.89')})
+        self.assertSameJSON({'rate': Decimal('0.00001')})
+        self.assertSameJSON({'id': 2**70})
+        self.assertSameJSON({'id': 1}, 'application/json; indent=4')
+        with self.assertRaises(ValueError):
+            ORJSONRenderer().render({'value': Decimal('NaN')})
+
+    def test_parses_like_json_parser(self):
+        content = '{"value": 10.5, "loan": 1, "date": "2021-01-01", "bank": "Itaú", "tags": [null]}'
+        for encoding in ['utf-8', 'latin-1']:
+            parser_context = {'encoding': encoding}
+            self.assertEqual(
+                ORJSONParser().parse(io.BytesIO(content.encode(encoding)),
+                                     parser_context=parser_context),
+                JSONParser().parse(io.BytesIO(content.encode(encoding)),
+                                   parser_context=parser_context)
+            )
+
+        for content in [b'{"value": }', b'{"value": NaN}', b'\xff']:
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(content))
@@ -0,0 +1,65 @@
+# Libs imports
+import datetime
+from decimal import Decimal
+
+# Django imports
+from django.test import TestCase
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, Payment
+
+
+class TestLoanQuerySet(TestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+
+    def create_loan(self, nominal_value, interest_rate, interest_type, months=12):
+        today = datetime.date.today()
+        month = today.month - 1 + months
+        return Loan.objects.create(
+            user_account=self.account,
+            nominal_value=Decimal(nominal_value),
+            interest_rate=Decimal(interest_rate),
+            end_date=datetime.date(today.year + month // 12, month % 12 + 1, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=interest_type
+        )
+
+    def assertFinancialsMatch(self, loan):
+        annotated = Loan.objects.with_financials().get(pk=loan.pk)
+        self.assertEqual(annotated.computed_months_difference,
+                         annotated.get_months_difference)
+        self.assertEqual(annotated.computed_interest_value,
+                         annotated.get_interest_value)
+        self.assertEqual(annotated.computed_full_debt,
+                         annotated.get_full_debt)
+        self.assertEqual(annotated.computed_total_paid,
+                         annotated.get_total_paid)
+        self.assertEqual(annotated.computed_outstanding_balance,
+                         annotated.get_outstanding_balance)
+
+    def test_with_financials_simple_interest(self):
+        loan = self.create_loan('20000.00', '5.50', Loan.InterestType.SIMPLE)
+        Payment.objects.create(loan=loan,
+                               value=Decimal('2500.00'),
+                               date=datetime.date.today())
+        self.assertFinancialsMatch(loan)
+
+    def test_with_financials_compound_interest(self):
+        loan = self.create_loan('12345.67', '3.17', Loan.InterestType.COMPOUND, months=37)
+        self.assertFinancialsMatch(loan)
+
+    def test_with_financials_rounds_half_to_even(self):
+        self.assertFinancialsMatch(
+            self.create_loan('2.50', '1.00', Loan.InterestType.SIMPLE)
+        )
+        self.assertFinancialsMatch(
+            self.create_loan('1.50', '1.00', Loan.InterestType.SIMPLE)
+        )
@@ -0,0 +1,95 @@
+# Libs imports
+import datetime
+from io import StringIO
+
+# Django imports
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+# Apps imports
+from account.models import Account
+from loan_manager.perf import get_samples
+from transactions.models import Loan, Payment
+from transactions.tests.utils import query_budget
+
+# Maximum number of queries of each endpoint, whatever the number of rows
+QUERY_BUDGETS = {
+    'loans_list': 1,
+    'loan_detail': 1,
+    'loans_batch': 1,
+    'payments_per_loan': 2,
+    'payments_list': 1,
+    'payment_detail': 1,
+}
+
+
+class TestQueryBudgets(APITestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        self.client.force_authenticate(self.account)
+
+    def create_loans(self, count):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        for _ in range(count):
+            loan = Loan.objects.create(
+                user_account=self.account,
+                nominal_value=20000,
+                interest_rate=5.5,
+                end_date=datetime.date(year+1, month, 20),
+                bank='BRB',
+                client='Jon',
+                interest_type=1
+            )
+            Payment.objects.create(
+                loan=loan,
+                value=2500,
+                date=datetime.date.today()
+            )
+
+    def get_urls(self):
+        loan = Loan.objects.first()
+        payment = Payment.objects.first()
+        return {
+            'loans_list': reverse('loans_list'),
+            'loan_detail': reverse('loan_detail', args=[loan.pk]),
+            'loans_batch': reverse('loans_batch') + '?ids=' + ','.join(
+                str(pk) for pk in Loan.objects.values_list('pk', flat=True)
+            ),
+            'payments_per_loan': reverse('payments_per_loan', args=[loan.pk]),
+            'payments_list': reverse('payments_list'),
+            'payment_detail': reverse('payment_detail', args=[payment.pk]),
+        }
+
+    def test_query_budgets(self):
+        for count in (1, 20):
+            self.create_loans(count)
+            for name, url in self.get_urls().items():
+                with query_budget(QUERY_BUDGETS[name], label=f'{name} with {count} loans'):
+                    self.client.get(url)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                       PERF_INSTRUMENTATION=True)
+    def test_perf_report(self):
+        # The local memory cache may hold the samples of other tests
+        cache.clear()
+        self.create_loans(3)
+        for _ in range(5):
+            self.client.get(reverse('loans_list'))
+
+        samples = get_samples('loans_list')
+        self.assertEqual(len(samples), 5)
+        self.assertLessEqual(max(sample[0] for sample in samples),
+                             QUERY_BUDGETS['loans_list'])
+
+        out = StringIO()
+        call_command('perf_report', 'loans_list', stdout=out)
+        self.assertIn('loans_list', out.getvalue())
@@ -0,0 +1,120 @@
+# Libs imports
+import datetime
+from decimal import Decimal
+
+# Django imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, Payment
+from transactions.tests.utils import sequential_scans
+
+# Tables that grow with the business and must never be scanned whole
+LARGE_TABLES = {Loan._meta.db_table, Payment._meta.db_table}
+
+ACCOUNTS = 200
+LOANS_PER_ACCOUNT = 20
+PAYMENTS_PER_LOAN = 3
+
+
+class TestQueryPlans(APITestCase):
+    """Run EXPLAIN on the queries of the hot endpoints over a seeded database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Account.objects.bulk_create([
+            Account(username=f'user{index}', email=f'user{index}@mail.com')
+            for index in range(ACCOUNTS)
+        ])
+        cls.accounts = list(Account.objects.order_by('pk'))
+        cls.admin = Account.objects.create_superuser(
+            email='admin@mail.com',
+            username='admin',
+            password='password123'
+        )
+
+        today = datetime.date.today()
+        loans = []
+        for index in range(ACCOUNTS * LOANS_PER_ACCOUNT):
+            loans.append(Loan(user_account=cls.accounts[index % ACCOUNTS],
+                              nominal_value=Decimal(1000 + index),
+                              interest_rate=Decimal('2.50'),
+                              request_date=today - datetime.timedelta(days=index % 365),
+                              end_date=today + datetime.timedelta(days=365),
+                              bank='BRB',
+                              client=f'Client {index}'))
+        for loan in loans:
+            loan.compute_balances()
+        Loan.objects.bulk_create(loans)
+
+        Payment.objects.bulk_create([
+            Payment(loan=loan,
+                    date=loan.request_date + datetime.timedelta(days=day),
+                    value=Decimal('10.00'))
+            for loan in loans
+            for day in range(PAYMENTS_PER_LOAN)
+        ])
+
+        with connection.cursor() as cursor:
+            for table in LARGE_TABLES:
+                cursor.execute(f'ANALYZE {table}')
+
+    def get_urls(self):
+        loan = Loan.objects.filter(user_account=self.accounts[0]).first()
+        payment = Payment.objects.filter(loan=loan).first()
+        today = datetime.date.today()
+        return {
+            'loans_list': reverse('loans_list'),
+            'overdue_loans': reverse('loans_list') + '?status=overdue',
+            'maturing_loans': reverse('loans_list') + '?maturing_in=30',
+            'bank_loans': reverse('loans_list') + '?bank=BRB',
+            'client_search': reverse('loans_list') + '?client=ient 12',
+            'loans_by_request_date': (reverse('loans_list')
+                                      + f'?request_date_after={today - datetime.timedelta(days=7)}'),
+            'loans_by_end_date': reverse('loans_list') + '?ordering=end_date',
+            'loans_by_balance': reverse('loans_list') + '?min_outstanding=1500&ordering=-outstanding_balance',
+            'loan_payments': reverse('payments_list') + f'?loan={loan.pk}&ordering=date',
+            'loan_detail': reverse('loan_detail', args=[loan.pk]),
+            'payments_per_loan': reverse('payments_per_loan', args=[loan.pk]),
+            'loan_schedule': reverse('loan_schedule', args=[loan.pk]),
+            'payments_list': reverse('payments_list'),
+            'payment_detail': reverse('payment_detail', args=[payment.pk]),
+        }
+
+    def assert_no_sequential_scans(self, account):
+        self.client.force_authenticate(account)
+        for name, url in self.get_urls().items():
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            for query in context.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                scanned = sequential_scans(query['sql'], LARGE_TABLES)
+                self.assertEqual(scanned, [],
+                                 f'{name} scans {", ".join(scanned)}:\n{query["sql"]}')
+
+    def test_user_endpoints_use_indexes(self):
+        self.assert_no_sequential_scans(self.accounts[0])
+
+    def test_admin_endpoints_use_indexes(self):
+        self.assert_no_sequential_scans(self.admin)
+
+    def test_financials_use_indexes(self):
+        loan = Loan.objects.filter(user_account=self.accounts[0]).first()
+        queries = [
+            Loan.objects.with_financials().filter(pk=loan.pk),
+            Loan.objects.with_financials().filter(user_account=self.accounts[0]),
+            Payment.objects.filter(loan__user_account=self.accounts[0]).order_by('-date', '-id')[:50],
+            # The loans read by scan_delinquency
+            Loan.objects.filter(status=Loan.Status.OPEN,
+                                end_date__lt=datetime.date.today()).order_by('end_date', 'id')[:10000],
+        ]
+        for queryset in queries:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                sql = cursor.mogrify(sql, params).decode('utf-8')
+            self.assertEqual(sequential_scans(sql, LARGE_TABLES), [], sql)
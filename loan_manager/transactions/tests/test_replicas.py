@@ -0,0 +1,127 @@
+# Libs imports
+import datetime
+import time
+import uuid
+
+# Django imports
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Apps imports
+from account.models import Account
+from loan_manager.db_router import ReplicaRouter, replica_reads
+from loan_manager.response_cache import data_version_key
+from transactions.models import Loan
+
+
+@override_settings(REPLICA_DATABASES=['replica'],
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestReplicaRouting(TransactionTestCase):
+    """The replica is a second database, copied to by hand in the tests.
+
+    Rows only created on the default database stand for the replication lag.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        token = Token.objects.get(user=self.account)
+        # Copied without signals, which would create rows on the default
+        Account.objects.using('replica').bulk_create([self.account])
+        Token.objects.using('replica').bulk_create([token])
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.loan_data = {
+            'nominal_value': 20000,
+            'interest_rate': 5.5,
+            'end_date': datetime.date(year+1, month, 20),
+            'bank': 'BRB',
+            'client': 'Jon',
+            'interest_type': 1
+        }
+        self.loan = Loan.objects.create(user_account=self.account, **self.loan_data)
+
+    def age_data_versions(self):
+        # As if the last writes were older than the pin timeout
+        version = f'{int(time.time()) - 60}-{uuid.uuid4().hex}'
+        for user_id in (self.account.pk, None):
+            cache.set(data_version_key('transactions', user_id), version, None)
+
+    def loan_ids(self):
+        response = self.client.get(reverse('loans_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_reads_after_writes(self):
+        # Served by the replica, which hasn't received the loan yet
+        self.age_data_versions()
+        self.assertEqual(self.loan_ids(), [])
+
+        response = self.client.post(reverse('loans_list'), self.loan_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Pinned to the primary after the write
+        self.assertEqual(self.loan_ids(), [response.data['id'], self.loan.pk])
+
+        # And back on the replica once the pin expires
+        cache.clear()
+        self.age_data_versions()
+        self.assertEqual(self.loan_ids(), [])
+
+    def test_reads_after_writes_of_others(self):
+        self.age_data_versions()
+        self.assertEqual(self.loan_ids(), [])
+
+        # Written by another client or by a command, so this client isn't
+        # pinned, but the responses cached under the new version must not
+        # come from the replica
+        loan = Loan.objects.create(user_account=self.account, **self.loan_data)
+        self.assertEqual(self.loan_ids(), [loan.pk, self.loan.pk])
+        response = self.client.get(reverse('loan_detail', args=[loan.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Cached and tagged from the primary
+        self.assertEqual(self.loan_ids(), [loan.pk, self.loan.pk])
+        response = self.client.get(reverse('loans_list'))
+        response = self.client.get(reverse('loans_list'),
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_read_the_primary(self):
+        # The loan only exists on the primary, so the validation of the
+        # payment has to read it there
+        response = self.client.post(reverse('payments_list'), {
+            'loan': self.loan.pk,
+            'date': datetime.date.today(),
+            'value': 500,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Loan))
+
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Loan), 'replica')
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(Loan))
+
+            self.assertEqual(router.db_for_write(Loan), 'default')
+            # Later reads of the request see its writes
+            self.assertIsNone(router.db_for_read(Loan))
+        finally:
+            replica_reads.reset(token)
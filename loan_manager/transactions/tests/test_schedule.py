@@ -0,0 +1,70 @@
+# Libs imports
+import datetime
+from decimal import Decimal
+
+# Django imports
+from django.test import TestCase
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, Payment
+from transactions.schedule import iter_schedules, loan_schedule
+
+
+class TestLoanSchedule(TestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        self.simple_loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=Decimal('20000.00'),
+            interest_rate=Decimal('5.50'),
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=Loan.InterestType.SIMPLE
+        )
+        self.compound_loan = Loan.objects.create(
+            user_account=self.account,
+            nominal_value=Decimal('12345.67'),
+            interest_rate=Decimal('1.37'),
+            end_date=datetime.date(year+2, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=Loan.InterestType.COMPOUND
+        )
+        Payment.objects.create(loan=self.compound_loan,
+                               value=Decimal('1000.00'),
+                               date=datetime.date.today())
+
+    def test_schedule_adds_up_to_loan_totals(self):
+        for loan in (self.simple_loan, self.compound_loan):
+            loan.refresh_from_db()
+            installments = loan_schedule(loan)
+            self.assertEqual(len(installments), loan.get_months_difference)
+            self.assertEqual(sum(row['interest'] for row in installments),
+                             loan.get_interest_value)
+            self.assertEqual(sum(row['installment'] for row in installments),
+                             loan.get_full_debt)
+            self.assertEqual(installments[-1]['expected_balance'], 0)
+            self.assertEqual(installments[-1]['balance'], loan.get_outstanding_balance)
+            self.assertEqual(installments[-1]['due_date'], loan.end_date)
+
+    def test_compound_interest_grows_each_month(self):
+        installments = loan_schedule(self.compound_loan)
+        self.assertEqual(installments[0]['paid'], Decimal('1000.00'))
+        self.assertLess(installments[0]['interest'], installments[-1]['interest'])
+
+    def test_iter_schedules_covers_portfolio(self):
+        months = 0
+        for loan_ids, schedule in iter_schedules(Loan.objects.all(), chunk_size=1):
+            self.assertEqual(len(loan_ids), 1)
+            months += len(schedule['month'])
+        self.assertEqual(months, sum(loan.get_months_difference
+                                     for loan in Loan.objects.all()))
@@ -0,0 +1,61 @@
+# Libs imports
+import datetime
+from decimal import Decimal
+
+# Django imports
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+# Apps imports
+from account.models import Account
+from transactions.api.serializers import (LoanReadSerializer, LoanSerializer,
+                                          PaymentReadSerializer, PaymentSerializer)
+from transactions.models import Loan, Payment
+
+
+class TestReadSerializers(TestCase):
+    """The read serializers render the same bytes as the model serializers."""
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        year = datetime.date.today().year
+        loans = [
+            Loan(user_account=self.account, nominal_value=Decimal('20000'),
+                 interest_rate=Decimal('5.5'), end_date=datetime.date(year+1, 1, 20),
+                 bank='BRB', client='Jon', interest_type=1),
+            Loan(user_account=self.account, nominal_value=Decimal('1234.56'),
+                 interest_rate=Decimal('0.07'), end_date=datetime.date(year+3, 12, 1),
+                 bank='Caixa', client='Jon Snow', interest_type=2,
+                 ip_address='192.168.0.1'),
+            Loan(user_account=self.account, nominal_value=Decimal('0.01'),
+                 interest_rate=Decimal('12.34'), end_date=datetime.date(year+10, 6, 30),
+                 bank='Itaú', client='"Ghost" \\ çã', interest_type=2,
+                 ip_address='::1'),
+        ]
+        for loan in loans:
+            loan.save()
+        for loan in Loan.objects.all():
+            for value in [Decimal('0.01'), Decimal('10.5')]:
+                Payment.objects.create(loan=loan, value=value, date=datetime.date.today())
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_loans(self):
+        request = APIRequestFactory().get('/loans/')
+        loans = Loan.objects.order_by('pk')
+        expected = LoanSerializer(loans, context={'request': request}, many=True).data
+        data = LoanReadSerializer(LoanReadSerializer.values(loans)).data
+        self.assertEqual(self.render(data), self.render(expected))
+
+    def test_payments(self):
+        request = APIRequestFactory().get('/payments/')
+        payments = Payment.objects.order_by('pk')
+        expected = PaymentSerializer(payments, context={'request': request}, many=True).data
+        data = PaymentReadSerializer(PaymentReadSerializer.values(payments)).data
+        self.assertEqual(self.render(data), self.render(expected))
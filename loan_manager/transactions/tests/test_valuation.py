@@ -0,0 +1,85 @@
+# Libs imports
+import datetime
+import random
+from decimal import Decimal
+
+import numpy as np
+
+# Django imports
+from django.test import TestCase
+
+# Apps imports
+from account.models import Account
+from transactions.models import Loan, Payment
+from transactions.valuation import Portfolio, Scenario, evaluate, interest_cents
+
+
+class TestLoanValuation(TestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            username='jon',
+            email='jon@mail.com',
+            password='password123'
+        )
+        generator = random.Random(0)
+        today = datetime.date.today()
+        for _ in range(40):
+            Loan.objects.create(
+                user_account=self.account,
+                nominal_value=Decimal(generator.randint(100, 10000000)).scaleb(-2),
+                interest_rate=Decimal(generator.randint(1, 999)).scaleb(-2),
+                end_date=today + datetime.timedelta(days=generator.randint(31, 3650)),
+                bank='BRB',
+                client='Jon',
+                interest_type=generator.choice(Loan.InterestType.values)
+            )
+        self.loan = Loan.objects.first()
+        Payment.objects.create(loan=self.loan,
+                               value=Decimal('10.00'),
+                               date=today)
+
+    def test_interest_matches_loan_model(self):
+        portfolio = Portfolio.load()
+        interest = interest_cents(portfolio.nominal,
+                                  portfolio.rate,
+                                  portfolio.interest_type,
+                                  portfolio.months)
+        loans = Loan.objects.in_bulk(portfolio.ids.tolist())
+        for loan_id, value in zip(portfolio.ids.tolist(), interest.tolist()):
+            self.assertEqual(Decimal(value).scaleb(-2), loans[loan_id].get_interest_value)
+
+    def test_interest_rounds_half_even(self):
+        # 1.50 at 1% and 4.50 at 1% are exactly half a cent
+        interest = interest_cents(np.array([150, 450, 150]),
+                                  np.array([100, 100, 100]),
+                                  np.array([1, 1, 2]),
+                                  np.array([12, 12, 1]))
+        self.assertEqual(interest.tolist(), [2, 4, 2])
+
+    def test_scenarios_match_loan_model(self):
+        scenarios = [Scenario('base'),
+                     Scenario('rates up', rate_delta=Decimal('1.25')),
+                     Scenario('longer', months_delta=6)]
+        results = evaluate(Portfolio.load(), scenarios, chunk_size=7)
+
+        loans = list(Loan.objects.all())
+        for result, scenario in zip(results, scenarios):
+            interest_value = sum(
+                Loan.compute_interest_value(loan.nominal_value,
+                                            loan.interest_rate + scenario.rate_delta,
+                                            loan.interest_type,
+                                            loan.get_months_difference + scenario.months_delta)
+                for loan in loans
+            )
+            nominal_value = sum(loan.nominal_value for loan in loans)
+            self.assertEqual(result['scenario'], scenario.name)
+            self.assertEqual(result['loans_count'], 40)
+            self.assertEqual(result['interest_value'], interest_value)
+            self.assertEqual(result['full_debt'], nominal_value + interest_value)
+            self.assertEqual(result['total_paid'], Decimal('10.00'))
+            self.assertEqual(result['outstanding_balance'],
+                             nominal_value + interest_value - Decimal('10.00'))
+
+        base = results[0]
+        self.assertEqual(base['full_debt'], sum(loan.get_full_debt for loan in loans))
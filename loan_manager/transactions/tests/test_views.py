@@ -1,14 +1,25 @@
 # Libs imports
+import csv
 import datetime
+import io
+import json
 
 # Django imports
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.settings import api_settings
 from rest_framework.test import APITestCase
 
 # Apps imports
 from account.models import Account
-from transactions.models import Loan, Payment
+from transactions.api.parsers import NDJSONParser
+from transactions.bulk import create_payments
+from transactions.models import Loan, Payment, PortfolioSummary
+from transactions.views import PaymentsBulk
 
 
 class TestTransactionsAPIViews(APITestCase):
@@ -64,10 +75,288 @@ class TestTransactionsAPIViews(APITestCase):
         response = self.client.get(reverse('loans_list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_loans_list_pagination(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        for _ in range(4):
+            Loan.objects.create(
+                user_account=self.first_account,
+                nominal_value=10000,
+                interest_rate=2.5,
+                end_date=datetime.date(year+1, month, 20),
+                bank='BRB',
+                client='Jon',
+                interest_type=1
+            )
+        loans = list(Loan.objects.filter(user_account=self.first_account)
+                                 .order_by('-request_date', '-id')
+                                 .values_list('id', flat=True))
+
+        response = self.client.get(reverse('loans_list'), {'page_size': 2})
+        self.assertEqual(response.data['previous'], None)
+        pages = [response.data]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(response.data)
+        self.assertEqual([loan['id'] for page in pages for loan in page['results']],
+                         loans)
+        self.assertEqual(len(pages), 3)
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'], pages[0]['results'])
+        self.assertEqual(response.data['previous'], None)
+
+    def test_loans_list_filters(self):
+        today = datetime.date.today()
+        overdue_loan = Loan.objects.create(
+            user_account=self.first_account,
+            nominal_value=10000,
+            interest_rate=2.5,
+            end_date=today + datetime.timedelta(days=10),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        )
+        maturing_loan = Loan.objects.create(
+            user_account=self.first_account,
+            nominal_value=10000,
+            interest_rate=2.5,
+            end_date=today + datetime.timedelta(days=10),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        )
+        Loan.objects.filter(pk=overdue_loan.pk).update(end_date=today - datetime.timedelta(days=1))
+        call_command('scan_delinquency', stdout=io.StringIO())
+
+        def loan_ids(params):
+            response = self.client.get(reverse('loans_list'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [loan['id'] for loan in response.data['results']]
+
+        self.assertEqual(loan_ids({'status': 'overdue'}), [overdue_loan.pk])
+        self.assertEqual(loan_ids({'status': 'paid'}), [])
+        self.assertEqual(loan_ids({'maturing_in': 30}), [maturing_loan.pk])
+        self.assertEqual(loan_ids({'status': 'open', 'maturing_in': 400}),
+                         [maturing_loan.pk, self.loan.pk])
+
+        for params in [{'status': 'late'}, {'maturing_in': -1}, {'maturing_in': 'soon'},
+                       {'maturing_in': 36501}, {'maturing_in': 99999999999}]:
+            response = self.client.get(reverse('loans_list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_loans_list_search_and_ordering(self):
+        today = datetime.date.today()
+        loans = {}
+        for days, bank, client, interest_type in [(30, 'Inter', 'Arya Stark', 2),
+                                                  (60, 'BRB', 'Sansa Stark', 1),
+                                                  (90, 'BRB', 'Jon Snow', 2)]:
+            loans[client] = Loan.objects.create(
+                user_account=self.first_account,
+                nominal_value=1000 * days,
+                interest_rate=2.5,
+                end_date=today + datetime.timedelta(days=days),
+                bank=bank,
+                client=client,
+                interest_type=interest_type
+            ).pk
+
+        def loan_ids(params):
+            response = self.client.get(reverse('loans_list'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [loan['id'] for loan in response.data['results']]
+
+        self.assertEqual(loan_ids({'bank': 'Inter'}), [loans['Arya Stark']])
+        self.assertEqual(loan_ids({'client': 'stark', 'ordering': 'id'}),
+                         [loans['Arya Stark'], loans['Sansa Stark']])
+        self.assertEqual(loan_ids({'client': 'jo', 'ordering': 'id'}),
+                         [self.loan.pk, loans['Jon Snow']])
+        self.assertEqual(loan_ids({'bank': 'BRB', 'interest_type': 2}), [loans['Jon Snow']])
+        self.assertEqual(loan_ids({'end_date_after': today + datetime.timedelta(days=45),
+                                   'end_date_before': today + datetime.timedelta(days=90),
+                                   'ordering': '-end_date'}),
+                         [loans['Jon Snow'], loans['Sansa Stark']])
+        self.assertEqual(loan_ids({'request_date_before': today - datetime.timedelta(days=1)}), [])
+        self.assertEqual(loan_ids({'min_outstanding': '60000', 'ordering': 'outstanding_balance'}),
+                         [loans['Sansa Stark'], loans['Jon Snow']])
+
+        # The cursors keep the requested ordering
+        response = self.client.get(reverse('loans_list'), {'ordering': 'end_date', 'page_size': 2})
+        ordered = [response.data['results'][0]['id'], response.data['results'][1]['id']]
+        response = self.client.get(response.data['next'])
+        ordered += [loan['id'] for loan in response.data['results']]
+        self.assertEqual(ordered, [loans['Arya Stark'], loans['Sansa Stark'],
+                                   loans['Jon Snow'], self.loan.pk])
+
+        for params in [{'interest_type': 3}, {'end_date_after': '20/01/2030'},
+                       {'min_outstanding': 'NaN'}, {'min_outstanding': '1e999999'},
+                       {'min_outstanding': '0.001'}, {'client': 'Jon\x00'},
+                       {'bank': '\x00'}, {'ordering': 'bank'}, {'ordering': '--id'}]:
+            response = self.client.get(reverse('loans_list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_payments_list_filters(self):
+        today = datetime.date.today()
+        payment = Payment.objects.create(
+            loan=self.loan,
+            value=1000,
+            date=today + datetime.timedelta(days=10)
+        )
+
+        response = self.client.get(reverse('payments_list'),
+                                   {'loan': self.loan.pk, 'ordering': 'date'})
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [self.payment.pk, payment.pk])
+        response = self.client.get(reverse('payments_list'),
+                                   {'date_after': today + datetime.timedelta(days=1)})
+        self.assertEqual([row['id'] for row in response.data['results']], [payment.pk])
+        response = self.client.get(reverse('payments_list'), {'loan': self.second_loan.pk})
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get(reverse('payments_list'), {'date_before': 'today'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_loans_list_cache_invalidated_by_payment(self):
+        response = self.client.get(reverse('loans_list'))
+        self.assertEqual(response.data['results'][0]['total_paid'], 2500)
+
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        data = {
+            'loan': self.loan.pk,
+            'date': '{}-{}-15'.format(year+1, month),
+            'value': 5000,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('payments_list'), data)
+        response = self.client.get(reverse('loans_list'))
+        self.assertEqual(response.data['results'][0]['total_paid'], 7500)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_loans_list_cache_per_user(self):
+        self.client.get(reverse('loans_list'))
+        self.client.logout()
+        self.client.force_authenticate(self.second_account)
+        response = self.client.get(reverse('loans_list'))
+        self.assertEqual([loan['id'] for loan in response.data['results']],
+                         [self.second_loan.pk])
+
+    def test_loan_detail_conditional_get(self):
+        url = reverse('loan_detail', args=[self.loan.pk])
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        # Only the loan is read, the serializer doesn't run
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A payment changes the balances of the loan
+        payment = Payment.objects.get(pk=self.payment.pk)
+        payment.value = 3000
+        payment.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_payments_per_loan_conditional_get(self):
+        url = reverse('payments_per_loan', args=[self.loan.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Other pages have their own ETags
+        response = self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Payment.objects.create(loan=self.loan, value=100, date=datetime.date.today())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_payment_detail_conditional_get(self):
+        url = reverse('payment_detail', args=[self.payment.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        payment = Payment.objects.get(pk=self.payment.pk)
+        payment.value = 3000
+        payment.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_get_other_user(self):
+        self.client.logout()
+        self.client.force_authenticate(self.second_account)
+        response = self.client.get(reverse('loan_detail', args=[self.loan.pk]))
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_loans_list_conditional_get(self):
+        etag = self.client.get(reverse('loans_list'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('loans_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(loan=self.loan, value=100, date=datetime.date.today())
+        response = self.client.get(reverse('loans_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_loans_list_invalid_cursor(self):
+        response = self.client.get(reverse('loans_list'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_loan_detail_get(self):
         response = self.client.get(reverse('loan_detail', args=[self.loan.pk]))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_loans_batch(self):
+        ids = [self.loan.pk, self.second_loan.pk, 0]
+        # Each loan as answered by LoanDetail
+        expected = {'0': {'detail': 'Not found.'}}
+        for pk in ids[:2]:
+            response = self.client.get(reverse('loan_detail', args=[pk]))
+            expected[str(pk)] = json.loads(response.content)
+
+        response = self.client.get(reverse('loans_batch'),
+                                   {'ids': ','.join(str(pk) for pk in ids + [self.loan.pk])})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(list(response.data), [str(pk) for pk in ids])
+
+        response = self.client.post(reverse('loans_batch'), {'ids': ids}, format='json')
+        self.assertEqual(json.loads(response.content), expected)
+        response = self.client.post(reverse('loans_batch'), {'ids': ids})
+        self.assertEqual(json.loads(response.content), expected)
+
+        for data in [{}, {'ids': ''}, {'ids': '1,a'}, {'ids': [1.5]}]:
+            response = self.client.post(reverse('loans_batch'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(MAX_PAGE_SIZE=2):
+            response = self.client.get(reverse('loans_batch'), {'ids': '1,2,3'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_loans_batch_admin(self):
+        admin = Account.objects.create_superuser(
+            username='admin',
+            email='admin@mail.com',
+            password='password123'
+        )
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('loans_batch'),
+                                   {'ids': f'{self.loan.pk},{self.second_loan.pk}'})
+        self.assertEqual([loan['client'] for loan in response.data.values()],
+                         ['Jon', 'Daenerys'])
+
     def test_loan_detail_other_user(self):
         self.client.logout()
         self.client.force_authenticate(self.second_account)
@@ -88,10 +377,65 @@ class TestTransactionsAPIViews(APITestCase):
         self.assertEqual(response.data,
                          {"detail": "You don't have permission to view this content."})
 
+    def test_payments_per_loan_not_found(self):
+        missing = Loan.objects.order_by('-pk').first().pk + 1
+        response = self.client.get(reverse('payments_per_loan', args=[missing]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_loan_schedule(self):
+        response = self.client.get(reverse('loan_schedule', args=[self.loan.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['installments']),
+                         self.loan.get_months_difference)
+        self.assertEqual(response.data['installments'][0]['paid'], 2500)
+
+    def test_loan_schedule_other_user(self):
+        self.client.logout()
+        self.client.force_authenticate(self.second_account)
+        response = self.client.get(reverse('loan_schedule', args=[self.loan.pk]))
+        self.assertEqual(response.data,
+                         {"detail": "You don't have permission to view this content."})
+
     def test_payments_list(self):
         response = self.client.get(reverse('payments_list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_loans_export_csv(self):
+        self.loan.refresh_from_db()
+        response = self.client.get(reverse('loans_export'), {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(int(rows[0]['id']), self.loan.pk)
+        self.assertEqual(rows[0]['total_paid'], '2500.00')
+        self.assertEqual(rows[0]['full_debt'], str(self.loan.get_full_debt))
+        self.assertEqual(rows[0]['outstanding_balance'],
+                         str(self.loan.get_outstanding_balance))
+
+    def test_loans_export_ndjson(self):
+        response = self.client.get(reverse('loans_export'), {'format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.loan.pk])
+
+    def test_payments_export(self):
+        response = self.client.get(reverse('payments_export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([(int(row['id']), row['value']) for row in rows],
+                         [(self.payment.pk, '2500.00')])
+
+    def test_payments_export_other_user(self):
+        self.client.logout()
+        self.client.force_authenticate(self.second_account)
+        response = self.client.get(reverse('payments_export'), {'format': 'ndjson'})
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
     def test_payment_detail_get(self):
         response = self.client.get(reverse('payment_detail', args=[self.payment.pk]))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -104,6 +448,70 @@ class TestTransactionsAPIViews(APITestCase):
         self.assertEqual(response.data,
                          {"detail": "You don't have permission to view this content."})
 
+    def test_portfolio_analytics(self):
+        PortfolioSummary.refresh()
+        self.loan.refresh_from_db()
+        self.second_loan.refresh_from_db()
+        self.client.logout()
+        admin = Account.objects.create_superuser(
+            email='admin@mail.com',
+            username='admin',
+            password='password123'
+        )
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('portfolio_analytics'),
+                                   {'group_by': 'bank,client'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals']['loans_count'], 2)
+        self.assertEqual(response.data['totals']['total_paid'], 2500)
+        self.assertEqual(response.data['totals']['full_debt'],
+                         self.loan.get_full_debt + self.second_loan.get_full_debt)
+        self.assertEqual([(group['client'], group['outstanding_balance'])
+                          for group in response.data['groups']],
+                         [('Daenerys', self.second_loan.get_outstanding_balance),
+                          ('Jon', self.loan.get_outstanding_balance)])
+        self.assertIsNone(response.data['next'])
+
+    def test_portfolio_analytics_pages_and_overdue(self):
+        # Overdue by its stored status, as set by scan_delinquency
+        Loan.objects.filter(pk=self.loan.pk).update(status=Loan.Status.OVERDUE)
+        PortfolioSummary.refresh()
+        admin = Account.objects.create_superuser(
+            email='admin@mail.com',
+            username='admin',
+            password='password123'
+        )
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('portfolio_analytics'),
+                                   {'group_by': 'client', 'page_size': 1})
+        self.assertEqual(response.data['totals']['overdue_count'], 1)
+        self.assertEqual([group['client'] for group in response.data['groups']], ['Daenerys'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(group['client'], group['overdue_count'])
+                          for group in response.data['groups']], [('Jon', 1)])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_portfolio_analytics_requires_admin(self):
+        response = self.client.get(reverse('portfolio_analytics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # Access follows is_admin, not is_staff
+        Account.objects.filter(pk=self.first_account.pk).update(is_staff=True)
+        self.first_account.refresh_from_db()
+        self.client.force_authenticate(self.first_account)
+        response = self.client.get(reverse('portfolio_analytics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        Account.objects.filter(pk=self.first_account.pk).update(is_staff=False,
+                                                                 is_admin=True)
+        self.first_account.refresh_from_db()
+        self.client.force_authenticate(self.first_account)
+        response = self.client.get(reverse('portfolio_analytics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     # Tests for POST requests
     def test_loan_with_simple_interest_post(self):
         loans_length = Loan.objects.all().count()
@@ -135,7 +543,8 @@ class TestTransactionsAPIViews(APITestCase):
                                          'client': 'Jon',
                                          'full_debt': last_loan.get_full_debt,
                                          'total_paid': last_loan.get_total_paid,
-                                         'outstanding_balance': last_loan.get_outstanding_balance})
+                                         'outstanding_balance': last_loan.get_outstanding_balance,
+                                         'status': 'open'})
         self.assertEqual(Loan.objects.all().count(), loans_length+1)
 
     def test_loan_post_for_other_users(self):
@@ -169,7 +578,8 @@ class TestTransactionsAPIViews(APITestCase):
                                          'client': 'Jon',
                                          'full_debt': last_loan.get_full_debt,
                                          'total_paid': last_loan.get_total_paid,
-                                         'outstanding_balance': last_loan.get_outstanding_balance})
+                                         'outstanding_balance': last_loan.get_outstanding_balance,
+                                         'status': 'open'})
         self.assertEqual(Loan.objects.all().count(), loans_length+1)
         self.assertEqual(last_loan.user_account, self.first_account)
 
@@ -239,7 +649,8 @@ class TestTransactionsAPIViews(APITestCase):
                                          'client': 'Jon',
                                          'full_debt': last_loan.get_full_debt,
                                          'total_paid': last_loan.get_total_paid,
-                                         'outstanding_balance': last_loan.get_outstanding_balance})
+                                         'outstanding_balance': last_loan.get_outstanding_balance,
+                                         'status': 'open'})
         self.assertEqual(Loan.objects.all().count(), loans_length+1)
 
     def test_payment_post(self):
@@ -262,6 +673,130 @@ class TestTransactionsAPIViews(APITestCase):
                                          'loan': last_payment.loan.pk})
         self.assertEqual(Payment.objects.all().count(), payments_length+1)
 
+    def test_payment_post_updates_loan_balances(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        data = {
+            'loan': self.loan.pk,
+            'date': date,
+            'value': 5000,
+        }
+        self.client.post(reverse('payments_list'), data)
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.total_paid, loan.get_total_paid)
+        self.assertEqual(loan.full_debt, loan.get_full_debt)
+        self.assertEqual(loan.outstanding_balance, loan.get_outstanding_balance)
+        self.assertEqual(loan.total_paid, 7500)
+
+    def test_payments_bulk_post(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        data = [
+            {'loan': self.loan.pk, 'date': date, 'value': '5000.00'},
+            {'loan': self.loan.pk, 'date': date, 'value': '10000.00'},
+        ]
+        response = self.client.post(reverse('payments_bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(Payment.objects.filter(loan=self.loan).count(), 3)
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.total_paid, 17500)
+        self.assertEqual(loan.outstanding_balance, loan.get_outstanding_balance)
+
+    def test_payments_bulk_post_rejects_invalid_rows(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        data = [
+            {'loan': self.loan.pk, 'date': date, 'value': '15000.00'},
+            {'loan': self.loan.pk, 'date': date, 'value': '5000.00'},
+            {'loan': self.second_loan.pk, 'date': date, 'value': '100.00'},
+            {'loan': self.loan.pk, 'date': date, 'value': '-1.00'},
+        ]
+        response = self.client.post(reverse('payments_bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        results = response.data['results']
+        self.assertIn('id', results[0])
+        self.assertEqual(results[1]['errors'],
+                         {'detail': "The total paid needs to be less or equal than the full debt."})
+        self.assertEqual(results[2]['errors'],
+                         {'detail': "You need to be the loan's user."})
+        self.assertIn('value', results[3]['errors'])
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).total_paid, 17500)
+
+    def test_payments_bulk_post_ndjson(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        body = '\n'.join(
+            '{"loan": %d, "date": "%s", "value": "1000.00"}' % (self.loan.pk, date)
+            for _ in range(3)
+        )
+        response = self.client.post(reverse('payments_bulk'), body,
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).total_paid, 5500)
+
+    def test_payments_bulk_post_rejects_other_bodies(self):
+        for body in ['null', '5', '"x"', '{"loan": 1}', '[]']:
+            response = self.client.post(reverse('payments_bulk'), body,
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+        response = self.client.post(reverse('payments_bulk'), '',
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_payments_bulk_post_invalid_ndjson(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        row = '{"loan": %d, "date": "%s", "value": "1000.00"}' % (self.loan.pk, date)
+        for body in [f'{row}\n\xff\xfe\n'.encode('latin-1'), f'{row}\n{{"loan": }}\n']:
+            response = self.client.post(reverse('payments_bulk'), body,
+                                        content_type='application/x-ndjson')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('line 2', response.data['detail'])
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_payments_bulk_post_uses_configured_json_parser(self):
+        self.assertEqual(PaymentsBulk.parser_classes,
+                         [api_settings.DEFAULT_PARSER_CLASSES[0], NDJSONParser])
+
+    def test_payments_bulk_post_locks_loans_in_order(self):
+        year = datetime.date.today().year
+        month = datetime.date.today().month
+        date = '{}-{}-15'.format(year+1, month)
+        loans = [Loan.objects.create(
+            user_account=self.first_account,
+            nominal_value=20000,
+            interest_rate=5.5,
+            end_date=datetime.date(year+1, month, 20),
+            bank='BRB',
+            client='Jon',
+            interest_type=1
+        ) for _ in range(3)]
+        rows = [{'loan': loan.pk, 'date': date, 'value': '100.00'}
+                for loan in reversed(loans)]
+        with CaptureQueriesContext(connection) as queries:
+            results = create_payments(rows, self.first_account, chunk_size=1)
+        self.assertTrue(all('id' in result for result in results))
+
+        # Every loan is locked, in order, before the first payment is inserted
+        locks = [index for index, query in enumerate(queries.captured_queries)
+                 if query['sql'].endswith('FOR UPDATE')]
+        inserts = [index for index, query in enumerate(queries.captured_queries)
+                   if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(locks), 3)
+        self.assertLess(locks[-1], inserts[0])
+        locked = [queries.captured_queries[index]['sql'] for index in locks]
+        for loan, sql in zip(loans, locked):
+            self.assertIn(f'IN ({loan.pk})', sql)
+
     def test_payment_post_for_other_users_loan(self):
         year = datetime.date.today().year
         month = datetime.date.today().month
@@ -365,7 +900,8 @@ class TestTransactionsAPIViews(APITestCase):
                                          'client': 'Jon Snow',
                                          'full_debt': loan.get_full_debt,
                                          'total_paid': loan.get_total_paid,
-                                         'outstanding_balance': loan.get_outstanding_balance})
+                                         'outstanding_balance': loan.get_outstanding_balance,
+                                         'status': 'open'})
 
     def test_loan_put_with_nominal_value_less_than_total_paid(self):
         year = datetime.date.today().year
@@ -456,7 +992,8 @@ class TestTransactionsAPIViews(APITestCase):
                                          'client': 'Jon Snow',
                                          'full_debt': loan.get_full_debt,
                                          'total_paid': loan.get_total_paid,
-                                         'outstanding_balance': loan.get_outstanding_balance})
+                                         'outstanding_balance': loan.get_outstanding_balance,
+                                         'status': 'open'})
         self.assertEqual(loan.user_account, self.first_account)
 
     def test_payment_put(self):
@@ -478,6 +1015,9 @@ class TestTransactionsAPIViews(APITestCase):
                                          'value': '7000.00',
                                          'date': date,
                                          'loan': payment.loan.pk})
+        self.assertEqual(payment.loan.total_paid, 7000)
+        self.assertEqual(payment.loan.outstanding_balance,
+                         payment.loan.get_outstanding_balance)
 
     def test_payment_put_with_value_bigger_than_loan(self):
         year = datetime.date.today().year
@@ -573,3 +1113,10 @@ class TestTransactionsAPIViews(APITestCase):
                                            args=[self.payment.pk]))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Payment.objects.all().count(), payments_length-1)
+
+    def test_payment_delete_updates_loan_balances(self):
+        self.client.delete(reverse('payment_detail',
+                                   args=[self.payment.pk]))
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.total_paid, 0)
+        self.assertEqual(loan.outstanding_balance, loan.get_full_debt)
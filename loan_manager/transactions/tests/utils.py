@@ -0,0 +1,42 @@
+# Libs imports
+import json
+from contextlib import contextmanager
+
+# Django imports
+from django.db import connection
+
+
+@contextmanager
+def query_budget(max_queries, label=''):
+    """Fail when the wrapped block runs more than ``max_queries`` queries."""
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        yield queries
+    if len(queries) > max_queries:
+        raise AssertionError(
+            f'{label or "Block"} ran {len(queries)} queries, budget is {max_queries}:\n'
+            + '\n'.join(queries)
+        )
+
+
+def sequential_scans(sql, tables):
+    """Tables among ``tables`` read by a sequential scan in the plan of ``sql``."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scanned = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables:
+            scanned.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return scanned
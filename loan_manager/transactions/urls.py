@@ -2,6 +2,9 @@
 # Django imports
 from django.urls import path
 
+# Project imports
+from loan_manager.async_views import async_view
+
 # Transactions app imports
 from transactions import views
 
@@ -13,18 +16,38 @@ urlpatterns = [
 
     # Transactions endpoints
     path('loans/',
-         views.LoansList.as_view(),
+         async_view(views.LoansList.as_view()),
          name='loans_list'),
+    path('loans/export/',
+         views.LoansExport.as_view(),
+         name='loans_export'),
+    path('loans/batch/',
+         async_view(views.LoansBatch.as_view()),
+         name='loans_batch'),
     path('loans/<int:pk>/',
-         views.LoanDetail.as_view(),
+         async_view(views.LoanDetail.as_view()),
          name='loan_detail'),
     path('loans/<int:pk>/payments/',
-         views.PaymentsPerLoan.as_view(),
+         async_view(views.PaymentsPerLoan.as_view()),
          name='payments_per_loan'),
+    path('loans/<int:pk>/schedule/',
+         views.LoanSchedule.as_view(),
+         name='loan_schedule'),
     path('payments/',
-         views.PaymentsList.as_view(),
+         async_view(views.PaymentsList.as_view()),
          name='payments_list'),
+    path('payments/bulk/',
+         views.PaymentsBulk.as_view(),
+         name='payments_bulk'),
+    path('payments/export/',
+         views.PaymentsExport.as_view(),
+         name='payments_export'),
     path('payments/<int:pk>/',
          views.PaymentDetail.as_view(),
-         name='payment_detail')
+         name='payment_detail'),
+
+    # Analytics endpoints
+    path('analytics/portfolio/',
+         views.PortfolioAnalytics.as_view(),
+         name='portfolio_analytics')
 ]
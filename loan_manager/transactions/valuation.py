@@ -0,0 +1,174 @@
+# Libs imports
+from collections import namedtuple
+from decimal import Decimal
+from itertools import islice
+
+import numpy as np
+
+# Django imports
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast
+
+# Transactions app imports
+from transactions.models import Loan
+from transactions.schedule import cents, months_difference
+
+# Relative distance from a half cent under which float results are
+# recomputed exactly, as the float error could flip the rounding
+TIE_TOLERANCE = 1e-13
+
+Scenario = namedtuple('Scenario', ['name', 'rate_delta', 'months_delta'],
+                      defaults=[Decimal(0), 0])
+Scenario.__doc__ = """A what-if scenario.
+
+``rate_delta`` is added to the interest rate of every loan, in percentage
+points, and ``months_delta`` to the months between their request and end
+dates.
+"""
+
+
+class Portfolio:
+    """Loans held as columnar arrays, with the money in integer cents.
+
+    ``rate`` is the interest rate in hundredths of a percent, so every
+    column is an integer and the simple interest is computed exactly.
+    """
+
+    def __init__(self, ids, nominal, rate, interest_type, months, paid):
+        self.ids = ids
+        self.nominal = nominal
+        self.rate = rate
+        self.interest_type = interest_type
+        self.months = months
+        self.paid = paid
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, loans=None, chunk_size=100000):
+        """Stream a queryset of loans (all of them by default) into arrays."""
+        if loans is None:
+            loans = Loan.objects.all()
+        rows = (loans.order_by()
+                     .values_list('pk',
+                                  cents('nominal_value'),
+                                  Cast(F('interest_rate') * 100, BigIntegerField()),
+                                  'interest_type',
+                                  months_difference('request_date', 'end_date'),
+                                  cents('total_paid'))
+                     .iterator(chunk_size=chunk_size))
+
+        chunks = []
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            chunks.append(np.array(chunk, dtype=np.int64))
+            chunk = list(islice(rows, chunk_size))
+        columns = (np.concatenate(chunks) if chunks
+                   else np.empty((0, 6), dtype=np.int64)).T
+        return cls(*columns)
+
+    def chunks(self, chunk_size):
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            yield Portfolio(self.ids[start:end],
+                            self.nominal[start:end],
+                            self.rate[start:end],
+                            self.interest_type[start:end],
+                            self.months[start:end],
+                            self.paid[start:end])
+
+
+def interest_cents(nominal, rate, interest_type, months):
+    """Interest in cents, rounded like ``Loan.get_interest_value``.
+
+    Takes broadcastable integer arrays, with ``rate`` in hundredths of a
+    percent. Simple interest is computed with integers and rounded half-even.
+    Compound interest is computed in floating point and the few results
+    within float error of a half cent are recomputed with Decimal.
+    """
+    nominal, rate, interest_type, months = np.broadcast_arrays(nominal, rate,
+                                                               interest_type, months)
+    if nominal.size and int(np.abs(nominal).max()) * int(np.abs(rate).max()) >= 2 ** 63:
+        # The products would overflow int64, fall back to Python integers
+        nominal = nominal.astype(object)
+
+    quotient, remainder = np.divmod(nominal * rate, 10000)
+    simple = quotient + ((remainder > 5000)
+                         | ((remainder == 5000) & (quotient % 2 == 1)))
+
+    with np.errstate(all='ignore'):
+        growth = np.expm1(months * np.log1p(rate / 10000))
+        compound_float = nominal.astype(np.float64) * growth
+    compound = np.rint(compound_float)
+    fraction = np.abs(compound_float - np.floor(compound_float) - 0.5)
+    inexact = ((interest_type != Loan.InterestType.SIMPLE)
+               & ~(fraction > np.abs(compound_float) * TIE_TOLERANCE + 1e-6))
+
+    result = np.where(interest_type == Loan.InterestType.SIMPLE, simple, compound)
+    if result.dtype == np.float64 and not (np.abs(compound) < 2 ** 62).all():
+        # Interest beyond int64 is left to the exact computation below
+        inexact |= ~(np.abs(compound) < 2 ** 62)
+        result = result.astype(object)
+    else:
+        result = result.astype(nominal.dtype)
+    for index in zip(*np.nonzero(inexact)):
+        result[index] = _exact_interest_cents(nominal[index], rate[index],
+                                              interest_type[index], months[index])
+    return result
+
+
+def _exact_interest_cents(nominal, rate, interest_type, months):
+    interest_value = Loan.compute_interest_value(Decimal(int(nominal)).scaleb(-2),
+                                                 Decimal(int(rate)).scaleb(-2),
+                                                 int(interest_type),
+                                                 int(months))
+    return int(interest_value.scaleb(2))
+
+
+def _rate_delta(scenario):
+    delta = Decimal(scenario.rate_delta) * 100
+    if delta != delta.to_integral_value():
+        raise ValueError(f'{scenario.name}: rate_delta accepts at most 2 decimal places.')
+    return int(delta)
+
+
+def evaluate(portfolio, scenarios, chunk_size=500000):
+    """Totals of the portfolio under each scenario.
+
+    All scenarios are evaluated at once over ``chunk_size`` loans, which
+    bounds the memory to a few arrays of ``len(scenarios) * chunk_size``.
+    Returns one dict per scenario with Decimal amounts.
+    """
+    scenarios = list(scenarios)
+    rate_deltas = np.array([_rate_delta(scenario) for scenario in scenarios],
+                           dtype=np.int64).reshape(-1, 1)
+    months_deltas = np.array([scenario.months_delta for scenario in scenarios],
+                             dtype=np.int64).reshape(-1, 1)
+
+    interest = np.zeros(len(scenarios), dtype=object)
+    outstanding = np.zeros(len(scenarios), dtype=object)
+    for chunk in portfolio.chunks(chunk_size):
+        chunk_interest = interest_cents(chunk.nominal,
+                                        chunk.rate + rate_deltas,
+                                        chunk.interest_type,
+                                        chunk.months + months_deltas)
+        interest += [int(total) for total in chunk_interest.sum(axis=1)]
+        chunk_outstanding = chunk_interest + (chunk.nominal - chunk.paid)
+        outstanding += [int(total) for total in chunk_outstanding.sum(axis=1)]
+
+    nominal = int(portfolio.nominal.sum())
+    total_paid = int(portfolio.paid.sum())
+    return [{
+        'scenario': scenario.name,
+        'loans_count': len(portfolio),
+        'nominal_value': _decimal(nominal),
+        'interest_value': _decimal(interest[index]),
+        'full_debt': _decimal(nominal + interest[index]),
+        'total_paid': _decimal(total_paid),
+        'outstanding_balance': _decimal(outstanding[index]),
+    } for index, scenario in enumerate(scenarios)]
+
+
+def _decimal(value):
+    return Decimal(int(value)).scaleb(-2)
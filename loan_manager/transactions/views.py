@@ -1,17 +1,35 @@
+# Libs imports
+from types import GeneratorType
+
 # Django imports
-from django.http import Http404
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.http import Http404, StreamingHttpResponse
 
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+# Project imports
+from account.permissions import IsAdmin
+from loan_manager.response_cache import (cache_response, conditional_response,
+                                         data_version_validator)
+
 # Transactions app imports
-from transactions.api.serializers import LoanSerializer, PaymentSerializer
-from transactions.models import Loan, Payment
+from transactions.api.parsers import NDJSONParser
+from transactions.api.renderers import CSVRenderer, NDJSONRenderer
+from transactions.api.serializers import (LoanReadSerializer, LoanSerializer,
+                                          PaymentReadSerializer, PaymentSerializer)
+from transactions.bulk import create_payments
+from transactions.export import export_loans, export_payments
+from transactions.filters import LoanFilter, PaymentFilter
+from transactions.models import Loan, Payment, PortfolioSummary
+from transactions.pagination import KeysetPagination, LoanPagination, PaymentPagination
+from transactions.schedule import loan_schedule
 
 
 class TransactionsOverview(APIView):
@@ -22,17 +40,27 @@ class TransactionsOverview(APIView):
         loan_urls = {
             "list": "loans/",
             "detail": "loans/<int:pk>/",
-            "payments_per_loan": "loans/<int:pk>/payments/"
+            "batch": "loans/batch/?ids=<int:pk>,<int:pk>",
+            "payments_per_loan": "loans/<int:pk>/payments/",
+            "schedule": "loans/<int:pk>/schedule/",
+            "export": "loans/export/?format=csv|ndjson",
         }
 
         payment_urls = {
             "list": "payments/",
             "detail": "payments/<int:pk>/",
+            "bulk": "payments/bulk/",
+            "export": "payments/export/?format=csv|ndjson",
+        }
+
+        analytics_urls = {
+            "portfolio": "analytics/portfolio/",
         }
 
         transactions_urls = {
             "loans": loan_urls,
             "payments": payment_urls,
+            "analytics": analytics_urls,
         }
 
         return Response(transactions_urls)
@@ -40,19 +68,24 @@ class TransactionsOverview(APIView):
 
 class LoansList(APIView):
     """List all loans or create a new loan."""
-    pagination_class = PageNumberPagination
+    filter_class = LoanFilter
+    pagination_class = LoanPagination
     permission_classes = [IsAuthenticated]
 
-    @method_decorator(cache_page(60 * 15, key_prefix='loan_list'))
+    @conditional_response(data_version_validator())
+    @cache_response('loan_list')
     def get(self, request, format=None):
         if request.user.is_admin:
             loans = Loan.objects.all()
         else:
             loans = Loan.objects.filter(user_account=request.user)
-        serializer = LoanSerializer(loans,
-                                    context={'request': request},
-                                    many=True)
-        return Response(serializer.data)
+        loan_filter = self.filter_class(request.query_params)
+        paginator = self.pagination_class()
+        paginator.ordering = loan_filter.get_ordering(paginator.ordering)
+        loans = loan_filter.filter_queryset(loans)
+        page = paginator.paginate_queryset(LoanReadSerializer.values(loans), request, view=self)
+        serializer = LoanReadSerializer(page)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, format=None):
         serializer = LoanSerializer(data=request.data,
@@ -63,20 +96,66 @@ class LoansList(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ExportView(APIView):
+    """Stream every row the user can see as CSV or NDJSON.
+
+    The format is chosen by the format query parameter or the Accept
+    header and defaults to CSV.
+    """
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    permission_classes = [IsAuthenticated]
+    filename = 'export'
+
+    def get_rows(self, request):
+        raise NotImplementedError
+
+    def get(self, request, format=None):
+        renderer = request.accepted_renderer
+        header, rows = self.get_rows(request)
+        response = StreamingHttpResponse(renderer.render_rows(header, rows),
+                                         content_type=renderer.media_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}.{renderer.format}"'
+        )
+        return response
+
+
+class LoansExport(ExportView):
+    """Export all loans with their computed balances."""
+    filename = 'loans'
+
+    def get_rows(self, request):
+        if request.user.is_admin:
+            loans = Loan.objects.all()
+        else:
+            loans = Loan.objects.filter(user_account=request.user)
+        return export_loans(LoanFilter(request.query_params).filter_queryset(loans))
+
+
 class LoanDetail(APIView):
     """Retrieve, update or delete a loan instance."""
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk):
+    def get_object(self, pk, lock=False):
+        queryset = Loan.objects.select_for_update() if lock else Loan.objects
         try:
-            return Loan.objects.get(pk=pk)
+            return queryset.get(pk=pk)
         except Loan.DoesNotExist:
             raise Http404
 
-    @method_decorator(cache_page(60 * 15, key_prefix='loan_detail'))
+    def get_version(self, request, pk, format=None):
+        """Version of the loan and of its payments, when the user can see it."""
+        self.loan = self.get_object(pk)
+        if self.loan.user_account_id != request.user.pk and not request.user.is_admin:
+            return None
+        return self.loan.version, self.loan.updated_at
+
+    @conditional_response(get_version)
+    @cache_response('loan_detail')
     def get(self, request, pk, format=None):
-        loan = self.get_object(pk)
-        if loan.user_account != request.user and not request.user.is_admin:
+        # Loaded by get_version
+        loan = self.loan
+        if loan.user_account_id != request.user.pk and not request.user.is_admin:
             return Response(
                 {'detail': "You don't have permission to view this content."}
             )
@@ -85,9 +164,10 @@ class LoanDetail(APIView):
                                     context={'request': request})
         return Response(serializer.data)
 
+    @transaction.atomic
     def put(self, request, pk, format=None):
-        loan = self.get_object(pk)
-        if loan.user_account != request.user:
+        loan = self.get_object(pk, lock=True)
+        if loan.user_account_id != request.user.pk:
             return Response(
                 {'detail': "You don't have permission to edit this content."}
             )
@@ -102,7 +182,7 @@ class LoanDetail(APIView):
 
     def delete(self, request, pk, format=None):
         loan = self.get_object(pk)
-        if loan.user_account != request.user:
+        if loan.user_account_id != request.user.pk:
             return Response(
                 {'detail': "You don't have permission to delete this content."}
             )
@@ -111,41 +191,147 @@ class LoanDetail(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class LoansBatch(APIView):
+    """Retrieve many loans with one query.
+
+    The ids are read from the ids query parameter, separated by commas, or
+    from the ids of a POST body for long lists. The response maps each id
+    to the loan, or to the error LoanDetail answers for it.
+    """
+    permission_classes = [IsAuthenticated]
+    not_found = {'detail': 'Not found.'}
+    forbidden = {'detail': "You don't have permission to view this content."}
+
+    def get(self, request, format=None):
+        return self.get_loans(request, request.query_params.get('ids'))
+
+    def post(self, request, format=None):
+        if not isinstance(request.data, dict):
+            raise ParseError('Expected an object with the ids.')
+        if hasattr(request.data, 'getlist') and len(request.data.getlist('ids')) > 1:
+            # Form data with one ids field per loan
+            return self.get_loans(request, request.data.getlist('ids'))
+        return self.get_loans(request, request.data.get('ids'))
+
+    def get_loans(self, request, ids):
+        ids = self.parse_ids(ids)
+        rows = LoanReadSerializer.values(Loan.objects.filter(pk__in=ids))
+        visible = []
+        forbidden = set()
+        for row in rows:
+            if row['user_account'] == request.user.pk or request.user.is_admin:
+                visible.append(row)
+            else:
+                forbidden.add(row['id'])
+
+        loans = {loan['id']: loan for loan in LoanReadSerializer(visible).data}
+        data = {}
+        for pk in ids:
+            if pk in loans:
+                data[str(pk)] = loans[pk]
+            elif pk in forbidden:
+                data[str(pk)] = self.forbidden
+            else:
+                data[str(pk)] = self.not_found
+        return Response(data)
+
+    def parse_ids(self, ids):
+        if isinstance(ids, str):
+            ids = ids.split(',')
+        if not isinstance(ids, list) or not ids:
+            raise ParseError('ids needs to be a list of loan ids.')
+        try:
+            # Repeated ids are answered once, in the order first requested
+            ids = list(dict.fromkeys(int(str(pk)) for pk in ids))
+        except (TypeError, ValueError):
+            raise ParseError('ids needs to be a list of loan ids.')
+        if len(ids) > settings.MAX_PAGE_SIZE:
+            raise ParseError(f'At most {settings.MAX_PAGE_SIZE} loans can be requested at once.')
+        return ids
+
+
 class PaymentsPerLoan(APIView):
     """List all payments of a loan."""
-    pagination_class = PageNumberPagination
+    pagination_class = PaymentPagination
     permission_classes = [IsAuthenticated]
 
-    @method_decorator(cache_page(60 * 15, key_prefix='paymentsperloan_list'))
+    def get_version(self, request, pk, format=None):
+        """Version of the loan, bumped by the changes of its payments."""
+        try:
+            self.loan = Loan.objects.get(pk=pk)
+        except Loan.DoesNotExist:
+            raise Http404
+        if self.loan.user_account_id != request.user.pk and not request.user.is_admin:
+            return None
+        return self.loan.version, self.loan.updated_at
+
+    @conditional_response(get_version)
+    @cache_response('paymentsperloan_list')
     def get(self, request, pk, format=None):
-        loan = Loan.objects.get(pk=pk)
-        if loan.user_account != request.user and not request.user.is_admin:
+        # Loaded by get_version
+        loan = self.loan
+        if loan.user_account_id != request.user.pk and not request.user.is_admin:
             return Response(
                 {'detail': "You don't have permission to view this content."}
             )
         payments = Payment.objects.filter(loan=loan)
-        serializer = PaymentSerializer(payments,
-                                       context={'request': request},
-                                       many=True)
-        return Response(serializer.data)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(PaymentReadSerializer.values(payments),
+                                           request, view=self)
+        serializer = PaymentReadSerializer(page)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class LoanSchedule(APIView):
+    """Month by month amortization schedule of a loan."""
+    permission_classes = [IsAuthenticated]
+
+    def get_version(self, request, pk, format=None):
+        """Version of the loan and of its payments, when the user can see it."""
+        try:
+            self.loan = Loan.objects.get(pk=pk)
+        except Loan.DoesNotExist:
+            raise Http404
+        if self.loan.user_account_id != request.user.pk and not request.user.is_admin:
+            return None
+        return self.loan.version, self.loan.updated_at
+
+    @conditional_response(get_version)
+    @cache_response('loan_schedule')
+    def get(self, request, pk, format=None):
+        # Loaded by get_version
+        loan = self.loan
+        if loan.user_account_id != request.user.pk and not request.user.is_admin:
+            return Response(
+                {'detail': "You don't have permission to view this content."}
+            )
+        return Response({'loan': loan.pk,
+                         'installments': loan_schedule(loan)})
 
 
 class PaymentsList(APIView):
     """List all payments or create a new payment."""
-    pagination_class = PageNumberPagination
+    filter_class = PaymentFilter
+    pagination_class = PaymentPagination
     permission_classes = [IsAuthenticated]
 
-    @method_decorator(cache_page(60 * 15, key_prefix='payment_list'))
+    @conditional_response(data_version_validator())
+    @cache_response('payment_list')
     def get(self, request, format=None):
         if request.user.is_admin:
             payments = Payment.objects.all()
         else:
             payments = Payment.objects.filter(loan__user_account=request.user)
-        serializer = PaymentSerializer(payments, 
-                                       context={'request': request},
-                                       many=True)
-        return Response(serializer.data)
-
+        payment_filter = self.filter_class(request.query_params)
+        paginator = self.pagination_class()
+        paginator.ordering = payment_filter.get_ordering(paginator.ordering)
+        payments = payment_filter.filter_queryset(payments)
+        page = paginator.paginate_queryset(PaymentReadSerializer.values(payments),
+                                           request, view=self)
+        serializer = PaymentReadSerializer(page)
+        return paginator.get_paginated_response(serializer.data)
+
+    @transaction.atomic
     def post(self, request, format=None):
         serializer = PaymentSerializer(data=request.data,
                                        context={'request': request})
@@ -155,20 +341,72 @@ class PaymentsList(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class PaymentsBulk(APIView):
+    """Create many payments from a JSON array or a NDJSON stream."""
+    # The JSON parser chosen by the API_JSON setting
+    parser_classes = [parser for parser in api_settings.DEFAULT_PARSER_CLASSES
+                      if parser.media_type == 'application/json'] + [NDJSONParser]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, format=None):
+        # A JSON array, or the generator of the rows of a NDJSON stream
+        if not isinstance(request.data, (list, GeneratorType)):
+            raise ParseError('Expected a list of payments.')
+
+        results = create_payments(request.data, request.user)
+        if not results:
+            raise ParseError('Expected at least one payment.')
+        created = sum(1 for result in results if 'id' in result)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': created,
+                         'rejected': len(results) - created,
+                         'results': results},
+                        status=response_status)
+
+
+class PaymentsExport(ExportView):
+    """Export all payments."""
+    filename = 'payments'
+
+    def get_rows(self, request):
+        if request.user.is_admin:
+            payments = Payment.objects.all()
+        else:
+            payments = Payment.objects.filter(loan__user_account=request.user)
+        return export_payments(PaymentFilter(request.query_params).filter_queryset(payments))
+
+
 class PaymentDetail(APIView):
     """Retrieve, update or delete a payment instance."""
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, pk):
+    def get_object(self, pk, lock=False):
+        queryset = Payment.objects.select_related('loan')
+        if lock:
+            queryset = queryset.select_for_update()
         try:
-            return Payment.objects.get(pk=pk)
+            return queryset.get(pk=pk)
         except Payment.DoesNotExist:
             raise Http404
 
-    @method_decorator(cache_page(60 * 15, key_prefix='payment_detail'))
+    def get_version(self, request, pk, format=None):
+        """Update time of the payment, when the user can see it."""
+        self.payment = self.get_object(pk)
+        if self.payment.loan.user_account_id != request.user.pk and not request.user.is_admin:
+            return None
+        return self.payment.updated_at.isoformat(), self.payment.updated_at
+
+    @conditional_response(get_version)
+    @cache_response('payment_detail')
     def get(self, request, pk, format=None):
-        payment = self.get_object(pk)
-        if payment.loan.user_account != request.user and not request.user.is_admin:
+        # Loaded by get_version
+        payment = self.payment
+        if payment.loan.user_account_id != request.user.pk and not request.user.is_admin:
             return Response(
                 {'detail': "You don't have permission to view this content."}
             )
@@ -177,9 +415,10 @@ class PaymentDetail(APIView):
                                     context={'request': request})
         return Response(serializer.data)
 
+    @transaction.atomic
     def put(self, request, pk, format=None):
-        payment = self.get_object(pk)
-        if payment.loan.user_account != request.user:
+        payment = self.get_object(pk, lock=True)
+        if payment.loan.user_account_id != request.user.pk:
             return Response(
                 {'detail': "You don't have permission to edit this content."}
             )
@@ -195,10 +434,56 @@ class PaymentDetail(APIView):
 
     def delete(self, request, pk, format=None):
         payment = self.get_object(pk)
-        if payment.loan.user_account != request.user:
+        if payment.loan.user_account_id != request.user.pk:
             return Response(
                 {'detail': "You don't have permission to delete this content."}
             )
 
         payment.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PortfolioAnalytics(APIView):
+    """Portfolio totals grouped by bank, client, interest type or request month.
+
+    The groups are paginated by cursor in the order of ``group_by``.
+    """
+    pagination_class = KeysetPagination
+    permission_classes = [IsAuthenticated, IsAdmin]
+    group_fields = ['bank', 'client', 'interest_type', 'request_month']
+    total_fields = ['loans_count',
+                    'nominal_value',
+                    'full_debt',
+                    'total_paid',
+                    'outstanding_balance',
+                    'overdue_count']
+
+    def get(self, request, format=None):
+        group_by = list(dict.fromkeys(request.query_params.get('group_by', 'bank').split(',')))
+        if not set(group_by) <= set(self.group_fields):
+            raise ParseError(f'group_by accepts: {", ".join(self.group_fields)}.')
+
+        sums = {f'sum_{name}': Sum(name) for name in self.total_fields}
+        summary = PortfolioSummary.objects.all()
+        totals = summary.aggregate(refreshed_at=Max('refreshed_at'), **sums)
+        # Each group is unique by its group_by values, which order the pages
+        paginator = self.pagination_class()
+        paginator.ordering = tuple(group_by)
+        groups = paginator.paginate_queryset(summary.values(*group_by).annotate(**sums),
+                                             request, view=self)
+        return Response({
+            'refreshed_at': totals.pop('refreshed_at'),
+            'totals': self.rename_sums(totals),
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'groups': [self.rename_sums(group) for group in groups],
+        })
+
+    def rename_sums(self, row):
+        renamed = {}
+        for name, value in row.items():
+            if name.startswith('sum_'):
+                renamed[name[len('sum_'):]] = value or 0
+            else:
+                renamed[name] = value
+        return renamed